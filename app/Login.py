@@ -1,6 +1,6 @@
 import streamlit as st
-import time
 from utils.auth import get_authenticator
+from utils.helpers import flash
 
 # Page Config
 st.set_page_config(page_title="Login", layout="centered", initial_sidebar_state="collapsed")
@@ -15,14 +15,26 @@ authenticator = get_authenticator()
 
 # 2. Render the Login Widget
 # ⚠️ CHANGE: Do not unpack variables here. Just call the function.
+cookie = authenticator.cookie_controller.cookie_model
+cookie_exp_date = cookie.exp_date
 authenticator.login()
 
 # 3. Handle the result using Session State
 if st.session_state.get('authentication_status'):
 
-    time.sleep(0.5)
-    # Success!
-    st.switch_page("pages/Dashboard_News.py")
+    if cookie.exp_date != cookie_exp_date:
+        # This run rendered the component that writes the re-auth cookie: let it finish
+        # instead of switching pages, or the component is torn down before its JS runs.
+        # Once the cookie is written the component reports back, which reruns this page.
+        st.session_state["_login_redirect"] = True
+        flash(f"Welcome, {st.session_state.get('name')}!", icon="👋")
+        st.success("Signed in. Opening the dashboard...")
+        st.page_link("pages/Dashboard_News.py", label="Open the dashboard", icon="➡️")
+    else:
+        # Success! The greeting is shown as a toast on the dashboard
+        if not st.session_state.pop("_login_redirect", False):
+            flash(f"Welcome, {st.session_state.get('name')}!", icon="👋")
+        st.switch_page("pages/Dashboard_News.py")
 
 elif st.session_state.get('authentication_status') is False:
     st.error('Username/password is incorrect')
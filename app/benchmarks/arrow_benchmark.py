@@ -0,0 +1,78 @@
+"""
+Rows/second and peak RSS of the default read path (pd.read_sql_query over
+psycopg2) vs the Arrow path (ADBC binary COPY -> pyarrow dtypes).
+
+Each run happens in a fresh subprocess so peak RSS is not shared between runs.
+Run from the app/ folder (uses .streamlit/secrets.toml and config.py):
+    python -m benchmarks.arrow_benchmark [--table social.monitoring] [--limit 1000000] [--repeat 3]
+"""
+import argparse
+import json
+import resource
+import statistics
+import subprocess
+import sys
+import time
+
+import config
+
+BACKENDS = ("sqlalchemy", "arrow")
+
+
+def worker(connection: str, backend: str, query: str):
+    """One timed read; prints {"rows", "seconds", "peak_rss_mb", "arrow_driver"} as JSON."""
+    from database.arrow_reader import adbc
+    from database.db_manager import DatabaseManager
+
+    db = DatabaseManager(connection)
+    db.fetch_data("SELECT 1", ttl=0, backend=backend)  # Connect outside the timed part
+
+    started = time.perf_counter()
+    df = db.fetch_data(query, ttl=0, backend=backend)
+    seconds = time.perf_counter() - started
+    print(json.dumps({
+        "rows": len(df),
+        "seconds": seconds,
+        "peak_rss_mb": resource.getrusage(resource.RUSAGE_SELF).ru_maxrss / 1024,  # KB on Linux
+        "arrow_driver": adbc is not None,
+    }))
+
+
+def run_once(connection: str, backend: str, query: str) -> dict:
+    output = subprocess.run(
+        [sys.executable, "-m", "benchmarks.arrow_benchmark", "--worker", backend,
+         "--connection", connection, "--query", query],
+        capture_output=True, text=True, check=True
+    ).stdout
+    return json.loads(output.strip().splitlines()[-1])
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--connection", default="dashboard_db", help="connection name in secrets.toml")
+    parser.add_argument("--table", default=config.SOCIAL_MEDIA_MONITORING_TABLE)
+    parser.add_argument("--limit", type=int, default=None, help="read at most this many rows")
+    parser.add_argument("--query", default=None, help="benchmark this SELECT instead of the table")
+    parser.add_argument("--repeat", type=int, default=3)
+    parser.add_argument("--worker", choices=BACKENDS, help=argparse.SUPPRESS)
+    args = parser.parse_args()
+
+    query = args.query or f"SELECT * FROM {args.table}" + (f" LIMIT {int(args.limit)}" if args.limit else "")
+    if args.worker:
+        worker(args.connection, args.worker, query)
+        return
+
+    results = {backend: [run_once(args.connection, backend, query) for _ in range(args.repeat)]
+               for backend in BACKENDS}
+    if not results["arrow"][0]["arrow_driver"]:
+        print("note: adbc-driver-postgresql is not installed, 'arrow' used the fallback path")
+
+    print(f"{'backend':<12}{'rows':>12}{'rows/s':>14}{'median s':>11}{'peak RSS MB':>14}")
+    for backend, runs in results.items():
+        seconds = statistics.median(r["seconds"] for r in runs)
+        print(f"{backend:<12}{runs[0]['rows']:>12,}{runs[0]['rows'] / seconds:>14,.0f}{seconds:>11.2f}"
+              f"{max(r['peak_rss_mb'] for r in runs):>14.0f}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,60 @@
+"""
+Throughput at high concurrency: DatabaseManager.fetch_data one query after the
+other (what the pages do today) vs AsyncDatabaseManager.fetch_many
+(asyncio.gather over asyncpg).
+
+Every "request" is a small query that also waits server-side (--latency-ms),
+like a dashboard panel query on a busy database.
+Run from the app/ folder (uses .streamlit/secrets.toml and config.py):
+    python -m benchmarks.async_benchmark [--concurrency 10 50 200] [--latency-ms 20]
+"""
+import argparse
+import time
+
+from database.async_db_manager import AsyncDatabaseManager
+from database.db_manager import DatabaseManager
+
+
+def batch(concurrency: int, latency_ms: int) -> dict:
+    # Distinct params per query so nothing is served from the cache
+    return {
+        f"q{i}": ("SELECT pg_sleep(:delay) AS slept, CAST(:i AS integer) AS i", {"delay": latency_ms / 1000, "i": i})
+        for i in range(concurrency)
+    }
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--connection", default="dashboard_db", help="connection name in secrets.toml")
+    parser.add_argument("--concurrency", type=int, nargs="+", default=[10, 50, 200])
+    parser.add_argument("--latency-ms", type=int, default=20)
+    parser.add_argument("--rounds", type=int, default=3)
+    args = parser.parse_args()
+
+    sync_db = DatabaseManager(args.connection)
+    async_db = AsyncDatabaseManager(args.connection)
+
+    runners = {
+        "sequential": lambda queries: {
+            name: sync_db.fetch_data(query, params, ttl=0) for name, (query, params) in queries.items()
+        },
+        "asyncio": lambda queries: async_db.run(async_db.fetch_many(queries, ttl=0)),
+    }
+    for run in runners.values():
+        run(batch(5, 0))  # Warm up both pools
+
+    print(f"{'concurrency':>12}{'sequential q/s':>16}{'asyncio q/s':>14}{'speed-up':>10}")
+    for concurrency in args.concurrency:
+        rates = {}
+        for name, run in runners.items():
+            started = time.perf_counter()
+            for _ in range(args.rounds):
+                results = run(batch(concurrency, args.latency_ms))
+                assert all(not df.empty for df in results.values()), f"{name}: some queries failed"
+            rates[name] = concurrency * args.rounds / (time.perf_counter() - started)
+        print(f"{concurrency:>12}{rates['sequential']:>16,.0f}{rates['asyncio']:>14,.0f}"
+              f"{rates['asyncio'] / rates['sequential']:>9.1f}x")
+
+
+if __name__ == "__main__":
+    main()
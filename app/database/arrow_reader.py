@@ -0,0 +1,106 @@
+"""
+Arrow-native read path for large results.
+
+With the ADBC PostgreSQL driver installed (pip install adbc-driver-postgresql),
+a SELECT is streamed with binary COPY straight into Arrow record batches and
+converted to a DataFrame with pyarrow-backed dtypes, so no Python tuple is
+ever built per row. Without the driver, or if the ADBC read fails, the usual
+SQLAlchemy / psycopg2 path is used with dtype_backend="pyarrow", so callers
+get the same dtypes either way.
+
+Select it per call with DatabaseManager.fetch_data(..., backend="arrow"),
+or for every read with config.READ_BACKEND = "arrow".
+Compare both paths: python -m benchmarks.arrow_benchmark
+"""
+import threading
+from contextlib import contextmanager
+from urllib.parse import quote, urlencode
+
+import pandas as pd
+import streamlit as st
+from sqlalchemy import text
+from sqlalchemy.dialects import postgresql
+from sqlalchemy.engine import Engine
+
+try:  # Optional dependency
+    import adbc_driver_postgresql.dbapi as adbc
+except ImportError:
+    adbc = None
+
+BACKENDS = ("sqlalchemy", "arrow")
+POOL_SIZE = 5
+
+
+class ArrowConnectionPool:
+    """A few reusable ADBC connections (ADBC connections are not thread-safe, so one per reader)."""
+
+    def __init__(self, uri: str, size: int = POOL_SIZE):
+        self.uri = uri
+        self.size = size
+        self._idle = []
+        self._lock = threading.Lock()
+
+    @contextmanager
+    def connection(self):
+        with self._lock:
+            conn = self._idle.pop() if self._idle else None
+        if conn is None:
+            # Autocommit: a pooled connection must not sit idle inside a transaction
+            conn = adbc.connect(self.uri, autocommit=True)
+        try:
+            yield conn
+        except Exception:
+            conn.close()  # State unknown after an error: do not reuse
+            raise
+        with self._lock:
+            if len(self._idle) < self.size:
+                self._idle.append(conn)
+                conn = None
+        if conn is not None:
+            conn.close()
+
+
+@st.cache_resource
+def get_arrow_pool(connection_name: str, uri: str) -> ArrowConnectionPool:
+    return ArrowConnectionPool(uri)
+
+
+# Compiles :named params to $1, $2, ... (the placeholders ADBC hands to the server)
+_BIND_DIALECT = postgresql.dialect(paramstyle="numeric_dollar")
+
+
+def bind_query(query: str, params: dict = None) -> tuple[str, tuple]:
+    """
+    :named params -> ($n SQL, positional values). The values are bound by the server
+    through ADBC, so nothing is quoted client-side and no other connection is needed.
+    """
+    compiled = text(query).compile(dialect=_BIND_DIALECT)
+    params = params or {}
+    return str(compiled), tuple(params[name] for name in compiled.positiontup)
+
+
+def libpq_uri(engine: Engine) -> str:
+    """
+    The engine's URL as a libpq URI for ADBC, keeping its query options (the session
+    timeouts set in get_engine). libpq does not read '+' as a space, so they are %20-quoted.
+    """
+    url = engine.url.set(drivername="postgresql")
+    uri = url.set(query={}).render_as_string(hide_password=False)
+    return f"{uri}?{urlencode(url.query, doseq=True, quote_via=quote)}" if url.query else uri
+
+
+def read_arrow(engine: Engine, connection_name: str, query: str, params: dict = None) -> pd.DataFrame:
+    """Reads through ADBC into Arrow; raises if the driver is missing or the read fails."""
+    if adbc is None:
+        raise ImportError("adbc-driver-postgresql is not installed")
+
+    sql, values = bind_query(query, params)
+    with get_arrow_pool(connection_name, libpq_uri(engine)).connection() as conn:
+        cursor = conn.cursor()
+        try:
+            # Without parameters the driver reads with binary COPY; bound queries are prepared
+            cursor.execute(sql, values or None)
+            table = cursor.fetch_arrow_table()
+        finally:
+            cursor.close()
+    return table.to_pandas(types_mapper=pd.ArrowDtype)
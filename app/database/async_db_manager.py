@@ -0,0 +1,188 @@
+"""
+Async variant of DatabaseManager on SQLAlchemy's AsyncEngine + asyncpg.
+
+Same results as the sync manager (DataFrames, (bool, message) for writes,
+shared query cache and metrics), so pages can move over one call at a time.
+asyncpg connections belong to the event loop that opened them, and Streamlit
+scripts have no loop of their own, so all async work runs on ONE background
+loop per process. Async code awaits the methods directly; page code wraps
+them with run():
+
+    adb = get_async_manager("dashboard_db")
+    df = adb.run(adb.fetch_data(sql, params))
+    results = adb.run(adb.fetch_many({"kpis": kpi_sql, "rows": (rows_sql, params)}))
+
+asyncpg binds parameters with the type Postgres infers for them and does not
+coerce: a bare ":param" with no type context (e.g. "SELECT :v") is text and
+must be given a str, or CAST in SQL. Params used in comparisons work as usual.
+
+Needs `pip install asyncpg`. Benchmark: python -m benchmarks.async_benchmark
+"""
+import asyncio
+import contextvars
+import threading
+import time
+
+import pandas as pd
+import streamlit as st
+from sqlalchemy import text
+from sqlalchemy.ext.asyncio import AsyncEngine, create_async_engine
+import config
+from database.db_manager import DatabaseManager, session_timeouts
+from database.metrics import calling_page, get_metrics_registry
+from database.query_cache import frame_bytes, get_query_cache, make_key, tables_in, tables_written
+
+ASYNC_POOL_SIZE = getattr(config, "ASYNC_POOL_SIZE", 20)
+ASYNC_MAX_OVERFLOW = getattr(config, "ASYNC_MAX_OVERFLOW", 20)
+
+# Page and error list of the run() call a coroutine belongs to (None when awaited directly)
+_call_context = contextvars.ContextVar("async_db_call", default=None)
+
+
+class _LoopThread:
+    """A daemon thread running the process-wide event loop for async database work."""
+
+    def __init__(self):
+        self.loop = asyncio.new_event_loop()
+        self._thread = threading.Thread(target=self.loop.run_forever, name="async-db-loop", daemon=True)
+        self._thread.start()
+
+    def submit(self, coro):
+        return asyncio.run_coroutine_threadsafe(coro, self.loop)
+
+
+@st.cache_resource
+def _get_loop_thread() -> _LoopThread:
+    return _LoopThread()
+
+
+_engines = {}  # connection name -> AsyncEngine; only touched from the loop thread
+
+
+def _get_async_engine(connection_name: str) -> AsyncEngine:
+    engine = _engines.get(connection_name)
+    if engine is None:
+        db_conf = st.secrets["connections"][connection_name]
+        url = f"{db_conf['dialect']}+asyncpg://{db_conf['username']}:{db_conf['password']}@{db_conf['host']}:{db_conf['port']}/{db_conf['database']}"
+        engine = _engines[connection_name] = create_async_engine(
+            url,
+            pool_size=ASYNC_POOL_SIZE,
+            max_overflow=ASYNC_MAX_OVERFLOW,
+            pool_pre_ping=True,
+            # Same statement / idle-in-transaction limits as the sync pool
+            connect_args={"server_settings": session_timeouts(db_conf)}
+        )
+    return engine
+
+
+class AsyncDatabaseManager:
+    def __init__(self, connection_name: str):
+        self.connection_name = connection_name
+        # Reuses the sync manager's TTL resolution and replica routing so both share cache entries
+        self._sync = DatabaseManager(connection_name)
+
+    def run(self, coro, timeout: float = None):
+        """
+        Runs a coroutine of this manager on the background loop and waits for it.
+        Read / write errors are shown with st.error here, on the script thread.
+        """
+        errors = []
+
+        async def with_context():
+            _call_context.set({"page": page, "errors": errors})
+            return await coro
+
+        page = calling_page()
+        result = _get_loop_thread().submit(with_context()).result(timeout)
+        for error in errors:
+            st.error(error)
+        return result
+
+    def _report(self, message: str):
+        context = _call_context.get()
+        if context is not None:
+            context["errors"].append(message)
+
+    def _page(self) -> str:
+        context = _call_context.get()
+        return context["page"] if context else "unknown"
+
+    def _record(self, query: str, started: float, rows: int = 0, nbytes: int = 0,
+                checkout_ms: float = None, error: str = None, operation: str = "async"):
+        get_metrics_registry().record(
+            operation, self.connection_name, query, (time.perf_counter() - started) * 1000,
+            rows=rows, nbytes=nbytes, checkout_ms=checkout_ms, page=self._page(), error=error
+        )
+
+    async def fetch_data(self, query: str, params: dict = None, ttl: float = None,
+                         timeout: float = None) -> pd.DataFrame:
+        """Async Safe Read: same caching and result as DatabaseManager.fetch_data."""
+        cache = get_query_cache()
+        tables = tables_in(query)
+        ttl = self._sync._cache_ttl(tables) if ttl is None else ttl
+        key = make_key(self.connection_name, query, params)
+
+        if ttl > 0:
+            cached = cache.get(key)
+            if cached is not None:
+                get_metrics_registry().record_cache_hit(self._page())
+                return cached
+
+        started, checkout_ms = time.perf_counter(), None
+        try:
+            async with _get_async_engine(self._sync._read_connection(tables)).connect() as conn:
+                checkout_ms = (time.perf_counter() - started) * 1000
+                if timeout:
+                    await conn.execute(text(f"SET LOCAL statement_timeout = {int(timeout * 1000)}"))
+                result = await conn.execute(text(query), params or {})
+                # Same construction as pd.read_sql_query, so dtypes match the sync path
+                df = pd.DataFrame.from_records(result.fetchall(), columns=list(result.keys()), coerce_float=True)
+        except Exception as e:
+            self._record(query, started, checkout_ms=checkout_ms, error=str(e))
+            self._report(f"❌ Read Error ({self.connection_name}): {e}")
+            return pd.DataFrame()
+
+        df = self._sync._compact(df, tables)
+        nbytes = frame_bytes(df)
+        self._record(query, started, rows=len(df), nbytes=nbytes, checkout_ms=checkout_ms)
+        cache.put(key, df, ttl, tables, nbytes=nbytes)
+        return df
+
+    async def fetch_many(self, queries: dict, timeout: float = None, ttl: float = None) -> dict:
+        """
+        Gathers independent reads concurrently: {name: (query, params) or query} -> {name: DataFrame}.
+        Each read gets `timeout` seconds (statement_timeout); failures come back empty, like fetch_data.
+        """
+        names = list(queries)
+        specs = [spec if isinstance(spec, tuple) else (spec, None) for spec in queries.values()]
+        frames = await asyncio.gather(*(
+            self.fetch_data(query, params, ttl=ttl, timeout=timeout) for query, params in specs
+        ))
+        return dict(zip(names, frames))
+
+    async def execute_query(self, query: str, params: dict = None) -> tuple[bool, str]:
+        """Async Safe Write: one transaction, invalidates cached reads of the written tables."""
+        started, checkout_ms = time.perf_counter(), None
+        try:
+            async with _get_async_engine(self.connection_name).connect() as conn:
+                checkout_ms = (time.perf_counter() - started) * 1000
+                async with conn.begin():
+                    result = await conn.execute(text(query), params or {})
+        except Exception as e:
+            self._record(query, started, checkout_ms=checkout_ms, error=str(e), operation="async_write")
+            return False, f"❌ Write Error: {e}"
+
+        self._record(query, started, rows=max(result.rowcount, 0), checkout_ms=checkout_ms,
+                     operation="async_write")
+        self._sync._written(tables_written(query))
+        return True, "✅ Success"
+
+    async def execute_many(self, statements: list) -> list[tuple[bool, str]]:
+        """Gathers independent writes [(query, params), ...]; each runs in its own transaction."""
+        return list(await asyncio.gather(*(self.execute_query(query, params) for query, params in statements)))
+
+
+@st.cache_resource
+def get_async_manager(target: str) -> AsyncDatabaseManager:
+    """One async manager per process (like utils.init_db.get_manager)."""
+    return AsyncDatabaseManager(target)
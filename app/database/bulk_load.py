@@ -0,0 +1,137 @@
+"""
+Bulk loading for Data Management: uploaded CSV / Parquet -> vectorized
+validation against the cached table schema -> COPY + upsert.
+"""
+import time
+from datetime import datetime
+
+import pandas as pd
+
+from database.schema_cache import primary_key_columns
+
+INT_TYPES = ('smallint', 'integer', 'bigint')
+FLOAT_TYPES = ('numeric', 'decimal', 'real', 'double precision')
+BOOL_VALUES = {
+    'true': True, 't': True, '1': True, 'yes': True, 'y': True,
+    'false': False, 'f': False, '0': False, 'no': False, 'n': False,
+}
+# Same system columns the Add form hides; they are filled by the database or by us
+SYSTEM_COLUMNS = ['created_at', 'last_updated_at']
+
+
+def read_upload(uploaded_file) -> pd.DataFrame:
+    """Reads an uploaded CSV (all values as strings) or Parquet file."""
+    if uploaded_file.name.lower().endswith(".parquet"):
+        return pd.read_parquet(uploaded_file)
+    return pd.read_csv(uploaded_file, dtype=str, keep_default_na=False, na_values=[""])
+
+
+def _coerce(raw: pd.Series, data_type: str) -> tuple[pd.Series, pd.Series, str]:
+    """Returns (converted values, mask of rows that failed conversion, error text)."""
+    present = raw.notna()
+    text = raw.astype("string").str.strip()
+
+    if data_type in INT_TYPES:
+        numbers = pd.to_numeric(text, errors="coerce")
+        bad = present & (numbers.isna() | (numbers % 1 != 0))
+        return numbers.where(~bad).astype("Int64"), bad, "not an integer"
+    if data_type in FLOAT_TYPES:
+        numbers = pd.to_numeric(text, errors="coerce")
+        return numbers, present & numbers.isna(), "not a number"
+    if data_type == 'boolean':
+        flags = text.str.lower().map(BOOL_VALUES)
+        return flags.astype("boolean"), present & flags.isna(), "not a boolean"
+    if data_type == 'date' or data_type.startswith('timestamp'):
+        dates = pd.to_datetime(text, errors="coerce")
+        return dates, present & dates.isna(), "not a date/time"
+    return raw, pd.Series(False, index=raw.index), ""
+
+
+def validate_frame(df: pd.DataFrame, schema_df: pd.DataFrame) -> tuple[pd.DataFrame, pd.DataFrame, list[str]]:
+    """
+    Validates an upload column by column (no per-row Python loop).
+    Returns (valid_rows, row_errors, file_errors):
+      - row_errors has one line per bad cell: row (1-based, as in the file), column, value, error;
+        rows sharing a primary key value are all reported, none of them is loaded
+      - file_errors lists problems that block the whole upload (unknown columns, ...)
+    """
+    schema = schema_df.set_index('column_name')
+    file_errors = []
+
+    unknown = [c for c in df.columns if c not in schema.index]
+    if unknown:
+        file_errors.append(f"Unknown columns: {', '.join(unknown)}")
+
+    required = schema[
+        ~schema['is_nullable'].astype(bool)
+        & schema['column_default'].isna()
+        & ~schema.index.isin(SYSTEM_COLUMNS)
+    ].index
+    missing = [c for c in required if c not in df.columns]
+    if missing:
+        file_errors.append(f"Missing required columns: {', '.join(missing)}")
+
+    if file_errors:
+        return df.iloc[0:0], pd.DataFrame(columns=['row', 'column', 'value', 'error']), file_errors
+
+    clean = pd.DataFrame(index=df.index)
+    bad_rows = pd.Series(False, index=df.index)
+    error_frames = []
+
+    for col in df.columns:
+        data_type = str(schema.at[col, 'data_type']).lower()
+        values, bad, message = _coerce(df[col], data_type)
+
+        if not schema.at[col, 'is_nullable'] and pd.isna(schema.at[col, 'column_default']):
+            null_bad = values.isna() & ~bad
+            if null_bad.any():
+                error_frames.append(pd.DataFrame({'row': df.index[null_bad], 'column': col,
+                                                  'value': None, 'error': "required value is empty"}))
+                bad_rows |= null_bad
+
+        if bad.any():
+            error_frames.append(pd.DataFrame({'row': df.index[bad], 'column': col,
+                                              'value': df.loc[bad, col].astype(str), 'error': message}))
+            bad_rows |= bad
+        clean[col] = values
+
+    # One upload row per primary key: otherwise the upsert fails on its own duplicates
+    keys = primary_key_columns(schema_df)
+    if keys and set(keys) <= set(clean.columns):
+        candidates = ~bad_rows & clean[keys].notna().all(axis=1)
+        duplicated = candidates & clean[keys].where(candidates).duplicated(keep=False)
+        if duplicated.any():
+            error_frames.append(pd.DataFrame({'row': df.index[duplicated], 'column': ", ".join(keys),
+                                              'value': df.loc[duplicated, keys].astype(str).agg(", ".join, axis=1),
+                                              'error': "duplicate primary key"}))
+            bad_rows |= duplicated
+
+    if 'created_at' in schema.index and 'created_at' not in clean.columns:
+        clean['created_at'] = datetime.now()
+
+    errors = pd.concat(error_frames, ignore_index=True) if error_frames else pd.DataFrame(
+        columns=['row', 'column', 'value', 'error'])
+    # Header is line 1 of the file, so data row i is line i + 2
+    errors['row'] = errors['row'].astype(int) + 2
+    return clean[~bad_rows], errors.sort_values(['row', 'column']).reset_index(drop=True), []
+
+
+def load_frame(db, table: str, df: pd.DataFrame, schema_df: pd.DataFrame, upsert: bool = True) -> dict:
+    """
+    COPY + INSERT (or upsert on the primary key when it is part of the upload).
+    Returns {"ok", "message", "rows", "seconds", "rows_per_second"}.
+    """
+    conflict_columns = primary_key_columns(schema_df) if upsert else None
+    if conflict_columns and not set(conflict_columns) <= set(df.columns):
+        conflict_columns = None  # No keys in the file: every row is a new record
+
+    started = time.perf_counter()
+    ok, message = db.bulk_upsert(table, df, conflict_columns)
+    seconds = time.perf_counter() - started
+    return {
+        "ok": ok,
+        "message": message,
+        "rows": len(df) if ok else 0,
+        "seconds": seconds,
+        "rows_per_second": len(df) / seconds if ok and seconds > 0 else 0.0,
+    }
@@ -0,0 +1,72 @@
+"""
+Optional dtype compaction for fetched DataFrames.
+
+read_sql_query leaves text columns as object dtype (one Python string per
+cell) and counts as int64. Every cached frame is copied into each session
+that reads it, so those widths multiply with concurrent users. Compaction
+runs once per query, before the result is cached:
+  - per-table hints from config.DTYPE_HINTS are applied first, e.g.
+      DTYPE_HINTS = {"social.monitoring": {"platform": "category", "scraped_count": "int32"}}
+  - with config.COMPACT_DTYPES on (True, or a list of connection names), low-cardinality
+    text columns become `category` and int64 columns are downcast (never below int32,
+    so sums and cumsums on the dashboards cannot overflow)
+A column is only converted when that makes it smaller. Floats are left alone
+(float32 would change values) unless a hint asks for it.
+"""
+import pandas as pd
+import config
+from database.query_cache import frame_bytes, normalize_table
+
+COMPACT_DTYPES = getattr(config, "COMPACT_DTYPES", False)
+DTYPE_HINTS = {normalize_table(t): hints for t, hints in getattr(config, "DTYPE_HINTS", {}).items()}
+# A text column becomes `category` when distinct values <= this share of the rows
+CATEGORY_MAX_RATIO = getattr(config, "CATEGORY_MAX_RATIO", 0.5)
+
+
+def compaction_enabled(connection_name: str) -> bool:
+    if isinstance(COMPACT_DTYPES, (list, tuple, set)):
+        return connection_name in COMPACT_DTYPES
+    return bool(COMPACT_DTYPES)
+
+
+def hints_for(tables: set[str]) -> dict:
+    """Column -> dtype hints of every table a query reads."""
+    hints = {}
+    for table in tables:
+        hints.update(DTYPE_HINTS.get(normalize_table(table), {}))
+    return hints
+
+
+def _compact_column(series: pd.Series):
+    """Smaller representation of one column, or None to keep it as is."""
+    if series.dtype == object:
+        if len(series) and pd.api.types.infer_dtype(series, skipna=True) == "string" \
+                and series.nunique(dropna=True) <= CATEGORY_MAX_RATIO * len(series):
+            return series.astype("category")
+    elif series.dtype == "int64":
+        downcast = pd.to_numeric(series, downcast="integer")
+        return downcast.astype("int32") if downcast.dtype.itemsize < 4 else downcast
+    return None
+
+
+def compact_frame(df: pd.DataFrame, hints: dict = None, auto: bool = True) -> tuple[pd.DataFrame, int, int]:
+    """Returns (compacted frame, bytes before, bytes after); the input frame is not modified."""
+    before = frame_bytes(df)
+    hints = hints or {}
+    compacted = df.copy(deep=False)
+
+    for col in df.columns:
+        series = df[col]
+        if col in hints:
+            try:
+                compacted[col] = series.astype(hints[col])
+                continue
+            except (TypeError, ValueError):
+                pass  # Hint does not fit the data (e.g. NULLs in an int column): fall back to auto
+        if not auto:
+            continue
+        converted = _compact_column(series)
+        if converted is not None and converted.memory_usage(deep=True) < series.memory_usage(deep=True):
+            compacted[col] = converted
+
+    return compacted, before, frame_bytes(compacted)
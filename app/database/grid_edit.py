@@ -0,0 +1,62 @@
+"""
+Grid editing for Data Management: turns the st.data_editor edit state into
+row-level changes for DatabaseManager.apply_row_changes, and patches the
+page's copy of the rows with what the database returned.
+"""
+import pandas as pd
+
+# Filled by the database; read-only in the grid and never sent back
+READ_ONLY_COLUMNS = ['id', 'created_at', 'last_updated_at']
+
+
+def _clean(value):
+    """Same normalisation as the forms: empty text becomes NULL."""
+    if value == "" or (not isinstance(value, (list, dict)) and pd.isna(value)):
+        return None
+    return value
+
+
+def diff_editor_state(frame: pd.DataFrame, state: dict, key: str = "id",
+                      read_only: list[str] = None) -> tuple[dict, list[dict], list]:
+    """
+    Reads st.data_editor's edit state (edited_rows / added_rows / deleted_rows, all
+    by row position in `frame`) and returns (updates, inserts, deletes):
+      updates: {key_value: {column: value}} - only the cells that actually changed
+      inserts: [{column: value}]           - read-only columns dropped
+      deletes: [key_value]
+    """
+    read_only = set(read_only if read_only is not None else READ_ONLY_COLUMNS) | {key}
+    updates = {}
+    for position, changes in state.get("edited_rows", {}).items():
+        row = frame.iloc[int(position)]
+        changed = {
+            col: _clean(value) for col, value in changes.items()
+            if col not in read_only and _clean(value) != _clean(row[col])
+        }
+        if changed:
+            updates[row[key].item() if hasattr(row[key], "item") else row[key]] = changed
+
+    inserts = []
+    for added in state.get("added_rows", []):
+        values = {col: _clean(value) for col, value in added.items() if col not in read_only}
+        if any(v is not None for v in values.values()):
+            inserts.append(values)
+
+    deletes = [frame.iloc[int(position)][key] for position in state.get("deleted_rows", [])]
+    deletes = [d.item() if hasattr(d, "item") else d for d in deletes]
+    return updates, inserts, deletes
+
+
+def patch_frame(frame: pd.DataFrame, refreshed: pd.DataFrame, deleted: list, key: str = "id") -> pd.DataFrame:
+    """Replaces updated rows in place, drops deleted ones and appends new ones (same order as before)."""
+    current = frame.set_index(key)
+    fresh = refreshed.set_index(key) if not refreshed.empty else refreshed
+    gone = set(deleted) | set(fresh.index)
+
+    order = [k for k in current.index if k not in deleted]
+    order += [k for k in fresh.index if k not in current.index]
+    kept = current[~current.index.isin(gone)]
+    parts = [p for p in (kept, fresh[current.columns.intersection(fresh.columns)]) if not p.empty]
+    if not parts:
+        return frame.iloc[0:0]
+    return pd.concat(parts).loc[order].reset_index()
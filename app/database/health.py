@@ -0,0 +1,124 @@
+"""
+Cheap database health checks for the System Status panels.
+
+Runs `SELECT 1` (never a table scan), reads the pool statistics and keeps a
+rolling window of probe latencies. Results are cached for a few seconds and
+shared by every session, so a busy dashboard probes the database at most
+once per HEALTH_CHECK_TTL.
+
+JSON report (run from the app/ folder):
+    python -m database.health [--connection dashboard_db]
+"""
+import argparse
+import json
+import threading
+import time
+from collections import deque
+from datetime import datetime
+
+import streamlit as st
+from sqlalchemy import text
+import config
+from database.db_manager import get_engine
+from database.metrics import pool_gauges
+
+HEALTH_CHECK_TTL = getattr(config, "HEALTH_CHECK_TTL", 5)
+LATENCY_WINDOW = 500
+
+
+def percentile(values: list[float], pct: float):
+    """Nearest-rank percentile; None for an empty window."""
+    if not values:
+        return None
+    ordered = sorted(values)
+    rank = max(int(round(pct / 100 * len(ordered))) - 1, 0)
+    return ordered[min(rank, len(ordered) - 1)]
+
+
+def pool_stats(engine) -> dict:
+    return {"status": engine.pool.status(), **pool_gauges(engine.pool)}
+
+
+class HealthMonitor:
+    """Process-wide probe cache plus per-connection latency history."""
+
+    def __init__(self, ttl: float = HEALTH_CHECK_TTL):
+        self.ttl = ttl
+        self._latencies = {}  # connection -> deque of ms
+        self._results = {}    # connection -> (checked_at monotonic, result dict)
+        self._lock = threading.Lock()
+
+    def check(self, connection_name: str, max_age: float = None) -> dict:
+        max_age = self.ttl if max_age is None else max_age
+        with self._lock:
+            cached = self._results.get(connection_name)
+            if cached and time.monotonic() - cached[0] < max_age:
+                return cached[1]
+
+        result = self._probe(connection_name)
+        with self._lock:
+            self._results[connection_name] = (time.monotonic(), result)
+        return result
+
+    def _probe(self, connection_name: str) -> dict:
+        result = {
+            "connection": connection_name,
+            "checked_at": datetime.now().isoformat(timespec="seconds"),
+            "connected": False,
+            "latency_ms": None,
+            "error": None,
+        }
+
+        engine = get_engine(connection_name)
+        if engine is None:
+            result["error"] = "No connection pool"
+            return result
+
+        started = time.perf_counter()
+        try:
+            with engine.connect() as conn:
+                conn.execute(text("SELECT 1"))
+            latency_ms = (time.perf_counter() - started) * 1000
+            result.update(connected=True, latency_ms=round(latency_ms, 2))
+        except Exception as e:
+            result["error"] = str(e)
+
+        with self._lock:
+            window = self._latencies.setdefault(connection_name, deque(maxlen=LATENCY_WINDOW))
+            if result["connected"]:
+                window.append(result["latency_ms"])
+            samples = list(window)
+
+        result["latency_percentiles_ms"] = {
+            "p50": percentile(samples, 50),
+            "p95": percentile(samples, 95),
+            "p99": percentile(samples, 99),
+        }
+        result["samples"] = len(samples)
+        result["pool"] = pool_stats(engine)
+        return result
+
+
+@st.cache_resource
+def get_health_monitor() -> HealthMonitor:
+    return HealthMonitor()
+
+
+def check_health(connection_name: str, max_age: float = None) -> dict:
+    """Cached health report for one connection (see HealthMonitor.check)."""
+    return get_health_monitor().check(connection_name, max_age)
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Print a JSON health report for database connections")
+    parser.add_argument("--connection", action="append", help="connection name in secrets.toml (repeatable)")
+    args = parser.parse_args()
+
+    connections = args.connection or list(st.secrets["connections"].keys())
+    report = [check_health(name, max_age=0) for name in connections]
+    print(json.dumps(report, indent=2, default=str))
+    raise SystemExit(0 if all(r["connected"] for r in report) else 1)
+
+
+if __name__ == "__main__":
+    main()
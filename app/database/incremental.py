@@ -0,0 +1,117 @@
+"""
+Incremental ("changes since last refresh") loading of row-level data.
+
+The first load of a (connection, table, filter) reads every matching row and
+remembers it in a process-wide store together with a watermark (the table's
+max updated_at). Later loads only read rows with updated_at >= watermark,
+merge them into the stored frame by key and drop rows that stopped matching
+the filter. Deletions are detected by comparing the stored row count with a
+server-side COUNT in the same snapshot; only on a mismatch is the key set
+re-read and diffed.
+"""
+import threading
+import time
+
+import pandas as pd
+import streamlit as st
+import config
+
+INCREMENTAL_MIN_INTERVAL = getattr(config, "INCREMENTAL_MIN_INTERVAL", 5)
+
+
+class IncrementalStore:
+    def __init__(self, min_interval: float = INCREMENTAL_MIN_INTERVAL):
+        self.min_interval = min_interval
+        self._entries = {}  # (connection, table, where, params) -> {"df", "watermark", "checked_at"}
+        self._lock = threading.Lock()
+
+    def load(self, db, table: str, where: str = "TRUE", params: dict = None,
+             key: str = "id", updated_column: str = "updated_at") -> pd.DataFrame:
+        """
+        Rows of `table` matching `where` (params bind as :name), kept up to date incrementally.
+        The returned frame is shared between sessions (copy-on-write, see query_cache.py).
+        Rows are read uncompacted: they are merged across refreshes and shown in st.data_editor.
+        """
+        params = params or {}
+        entry_key = (db.connection_name, table, where, repr(sorted(params.items())))
+        with self._lock:
+            entry = self._entries.get(entry_key)
+        if entry is not None and time.monotonic() - entry["checked_at"] < self.min_interval:
+            return entry["df"].copy(deep=False)
+
+        entry = self._refresh(db, table, where, params, key, updated_column, entry)
+        if entry is not None:
+            with self._lock:
+                self._entries[entry_key] = entry
+            return entry["df"].copy(deep=False)
+        return pd.DataFrame()
+
+    def _refresh(self, db, table, where, params, key, updated_column, entry):
+        if entry is None:
+            # Full load; rows and watermark come from the same snapshot
+            results = db.fetch_batch({
+                "rows": (f"SELECT * FROM {table} WHERE {where}", params),
+                "watermark": f"SELECT MAX({updated_column}) AS watermark FROM {table}",
+            }, ttl=0, compact=False)
+            if "watermark" not in results or results["watermark"].empty:
+                return None
+            return {
+                "df": results["rows"].reset_index(drop=True),
+                "watermark": results["watermark"]["watermark"].iloc[0],
+                "checked_at": time.monotonic(),
+            }
+
+        df, watermark = entry["df"], entry["watermark"]
+        if pd.isna(watermark):
+            return self._refresh(db, table, where, params, key, updated_column, None)
+
+        # >= so rows committed later with the same timestamp are not missed; the merge dedupes them
+        results = db.fetch_batch({
+            "changed": (
+                f"SELECT *, ({where}) AS _matches FROM {table} WHERE {updated_column} >= :_watermark",
+                {**params, "_watermark": watermark},
+            ),
+            "count": (f"SELECT COUNT(*) AS n FROM {table} WHERE {where}", params),
+        }, ttl=0, compact=False)
+        changed, count = results.get("changed"), results.get("count")
+        if changed is None or count is None or count.empty:
+            return entry  # Read failed (already reported); keep serving the old frame
+
+        if not changed.empty:
+            matching = changed[changed["_matches"].eq(True)].drop(columns="_matches")
+            df = df[~df[key].isin(changed[key])]
+            df = pd.concat([df, matching], ignore_index=True) if not matching.empty else df.reset_index(drop=True)
+            watermark = max(watermark, changed[updated_column].max())
+
+        if len(df) != int(count["n"].iloc[0]):
+            # Something was deleted (or moved out without touching updated_at): diff the key set
+            keys = db.fetch_data(f"SELECT {key} FROM {table} WHERE {where}", params, ttl=0, compact=False)
+            df = df[df[key].isin(keys[key])].reset_index(drop=True)
+            if len(df) != len(keys):
+                # Rows entered the filter without touching updated_at: start over
+                return self._refresh(db, table, where, params, key, updated_column, None)
+
+        return {"df": df, "watermark": watermark, "checked_at": time.monotonic()}
+
+    def invalidate(self, table: str = None):
+        """Forgets stored frames (of one table or all); the next load is a full load."""
+        with self._lock:
+            for entry_key in [k for k in self._entries if table in (None, k[1])]:
+                del self._entries[entry_key]
+
+    def stats(self) -> dict:
+        with self._lock:
+            return {
+                "frames": len(self._entries),
+                "rows": sum(len(e["df"]) for e in self._entries.values()),
+            }
+
+
+@st.cache_resource
+def get_incremental_store() -> IncrementalStore:
+    """One store per process, shared by every session."""
+    return IncrementalStore()
+
+
+def load_incremental(db, table: str, where: str = "TRUE", params: dict = None, **kwargs) -> pd.DataFrame:
+    return get_incremental_store().load(db, table, where, params, **kwargs)
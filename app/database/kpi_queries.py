@@ -0,0 +1,82 @@
+"""
+Server-side KPI queries for the dashboards.
+Each function returns a handful of aggregated rows instead of the whole table.
+"""
+import pandas as pd
+
+from database.incremental import load_incremental
+
+# Failure codes shown on the News dashboard
+FAILURE_CODES = ['NO_PORTAL', 'NO_ARTICLE', 'BAD_SEL']
+
+
+def news_kpi_query(table: str) -> str:
+    """
+    Totals, status counts, last update and the failure_code breakdown in one round trip.
+    GROUPING SETS returns one row per failure_code plus a grand-total row (is_total = 1).
+    """
+    return f"""
+        SELECT
+            GROUPING(failure_code) AS is_total,
+            failure_code,
+            COUNT(*) AS total_sources,
+            COUNT(*) FILTER (WHERE status = 'SUCCESS') AS total_success,
+            COUNT(*) FILTER (WHERE status = 'FAILED') AS total_failed,
+            MAX(updated_at) AS latest_updated
+        FROM {table}
+        GROUP BY GROUPING SETS ((failure_code), ())
+    """
+
+
+def failure_rows_query(table: str, failure_codes: list[str] = None) -> tuple[str, dict]:
+    return (
+        f"SELECT * FROM {table} WHERE failure_code = ANY(:failure_codes)",
+        {"failure_codes": list(failure_codes or FAILURE_CODES)},
+    )
+
+
+def fetch_news_kpis(db, table: str, failure_codes: list[str] = None, ttl: float = None) -> dict:
+    """Runs news_kpi_query and shapes the result for the KPI cards and the chart."""
+    return summarize_news_kpis(db.fetch_data(news_kpi_query(table), ttl=ttl), failure_codes)
+
+
+def summarize_news_kpis(df: pd.DataFrame, failure_codes: list[str] = None) -> dict:
+    """Turns the news_kpi_query result into KPI values plus the failures-by-code frame."""
+    failure_codes = failure_codes or FAILURE_CODES
+
+    totals = df[df['is_total'] == 1] if not df.empty else df
+    if totals.empty:
+        return {
+            "total_sources": 0,
+            "total_success": 0,
+            "total_failed": 0,
+            "latest_updated": None,
+            "failures_by_code": pd.DataFrame(columns=['failure_code', 'total_failures']),
+        }
+
+    total_row = totals.iloc[0]
+    by_code = df[(df['is_total'] == 0) & df['failure_code'].isin(failure_codes)]
+    failures_by_code = (
+        by_code[['failure_code', 'total_sources']]
+        .rename(columns={'total_sources': 'total_failures'})
+        .sort_values('failure_code')
+        .reset_index(drop=True)
+    )
+
+    return {
+        "total_sources": int(total_row['total_sources']),
+        "total_success": int(total_row['total_success']),
+        "total_failed": int(total_row['total_failed']),
+        "latest_updated": pd.to_datetime(total_row['latest_updated']),
+        "failures_by_code": failures_by_code,
+    }
+
+
+def fetch_failure_rows(db, table: str, failure_codes: list[str] = None) -> pd.DataFrame:
+    """
+    Rows behind the failure chart; only call this when the preview is actually shown.
+    After the first call only rows whose updated_at advanced are re-read (see database/incremental.py).
+    """
+    return load_incremental(
+        db, table, "failure_code = ANY(:failure_codes)", {"failure_codes": list(failure_codes or FAILURE_CODES)}
+    )
@@ -0,0 +1,206 @@
+"""
+Live refresh for the wall-monitor dashboards.
+
+Panels are st.fragment(run_every=...) functions, so a refresh re-runs only the
+panel, not require_login(), the CSS or the other panels. Whether a panel
+re-queries is decided by the query cache: a background listener holds a
+Postgres LISTEN on CHANNEL and, when a trigger on a scraper table fires
+NOTIFY (payload = table name), drops that table's cached results. While the
+listener is connected AND has found the triggers on every table in
+notified_tables(), panel reads use a long cache TTL, so a timed refresh
+costs a cache lookup unless the data actually changed. Otherwise the normal
+TTL applies (plain polling).
+
+Install the triggers (run from the app/ folder):
+    python -m database.live --install-triggers
+"""
+import argparse
+import select
+import threading
+import time
+
+import streamlit as st
+import config
+from database.query_cache import get_query_cache, normalize_table
+
+CHANNEL = getattr(config, "LIVE_CHANNEL", "scraper_status_changed")
+# run_every per panel (seconds) in live mode
+LIVE_REFRESH_SECONDS = {
+    "news": 30,
+    "social_overview": 60,
+    "social_trends": 300,
+    "social_status": 15,
+    **getattr(config, "LIVE_REFRESH_SECONDS", {}),
+}
+# Cache TTL for panel reads while notifications are flowing (invalidation is pushed)
+LIVE_CACHE_TTL = getattr(config, "LIVE_CACHE_TTL", 3600)
+POLL_SECONDS = 5
+RECONNECT_SECONDS = 30
+# How often the listener re-checks that the NOTIFY triggers are still installed
+TRIGGER_CHECK_SECONDS = 300
+
+
+def notified_tables() -> list[str]:
+    """Tables whose writes NOTIFY the channel once --install-triggers has run."""
+    from database.rollup import ROLLUP_TABLE
+    return [config.DASHBOARD_TABLE, config.SOCIAL_MEDIA_MONITORING_TABLE, ROLLUP_TABLE]
+
+
+def trigger_name(table: str, channel: str = CHANNEL) -> str:
+    return f"{table.split('.')[-1]}_{channel}"[:63]
+
+
+class ChangeListener:
+    """LISTENs on one connection in a daemon thread and invalidates cached reads on NOTIFY."""
+
+    def __init__(self, engine, channel: str = CHANNEL):
+        self.engine = engine
+        self.channel = channel
+        self.connected = False
+        self.triggers_installed = False
+        self.last_error = None
+        self._versions = {}  # table -> number of change notifications seen
+        self._lock = threading.Lock()
+        self._stop = threading.Event()
+        self._thread = None
+
+    def start(self):
+        if self.engine is not None and self._thread is None:
+            self._thread = threading.Thread(target=self._run, name=f"listen-{self.channel}", daemon=True)
+            self._thread.start()
+        return self
+
+    def stop(self):
+        self._stop.set()
+
+    def _run(self):
+        while not self._stop.is_set():
+            conn = None
+            try:
+                # Detached: this connection is held for good and must not count against the pool
+                pooled = self.engine.raw_connection()
+                pooled.detach()
+                conn = pooled.dbapi_connection
+                conn.autocommit = True
+                with conn.cursor() as cursor:
+                    cursor.execute(f'LISTEN "{self.channel}"')
+                self.connected, self.last_error = True, None
+                self.triggers_installed = self._check_triggers(conn)
+                checked = time.monotonic()
+
+                while not self._stop.is_set():
+                    if time.monotonic() - checked > TRIGGER_CHECK_SECONDS:
+                        self.triggers_installed = self._check_triggers(conn)
+                        checked = time.monotonic()
+                    if select.select([conn], [], [], POLL_SECONDS) == ([], [], []):
+                        continue
+                    conn.poll()
+                    while conn.notifies:
+                        self.notify(conn.notifies.pop(0).payload)
+            except Exception as e:
+                self.connected, self.triggers_installed, self.last_error = False, False, str(e)
+                self._stop.wait(RECONNECT_SECONDS)
+            finally:
+                if conn is not None:
+                    try:
+                        conn.close()
+                    except Exception:
+                        pass
+        self.connected = False
+
+    def _check_triggers(self, conn) -> bool:
+        """True when every table in notified_tables() has its enabled NOTIFY trigger."""
+        expected = {normalize_table(table): trigger_name(table, self.channel) for table in notified_tables()}
+        with conn.cursor() as cursor:
+            cursor.execute(
+                """
+                SELECT n.nspname || '.' || c.relname, t.tgname
+                FROM pg_trigger t
+                JOIN pg_class c ON c.oid = t.tgrelid
+                JOIN pg_namespace n ON n.oid = c.relnamespace
+                WHERE t.tgname = ANY(%s) AND t.tgenabled <> 'D'
+                """,
+                (list(expected.values()),)
+            )
+            found = {(normalize_table(table), name) for table, name in cursor.fetchall()}
+        return all(item in found for item in expected.items())
+
+    def notify(self, table: str):
+        """Handles one change of `table`. Also the in-process stand-in for a NOTIFY (tests, scripts)."""
+        table = normalize_table(table)
+        with self._lock:
+            self._versions[table] = self._versions.get(table, 0) + 1
+        get_query_cache().invalidate({table})
+
+    def version(self, tables) -> tuple:
+        """Changes seen per table; compare two calls to know whether anything changed in between."""
+        with self._lock:
+            return tuple(self._versions.get(normalize_table(t), 0) for t in tables)
+
+
+@st.cache_resource
+def get_change_listener(connection_name: str) -> ChangeListener:
+    """One listener thread per connection and process."""
+    from database.db_manager import get_engine
+    return ChangeListener(get_engine(connection_name)).start()
+
+
+def live_enabled() -> bool:
+    return bool(st.session_state.get("live_refresh"))
+
+
+def refresh_interval(panel: str):
+    """run_every for a panel's st.fragment: its interval in live mode, None otherwise."""
+    return LIVE_REFRESH_SECONDS.get(panel, 60) if live_enabled() else None
+
+
+def live_ttl(connection_name: str):
+    """
+    Cache TTL for panel reads: long while notifications invalidate the cache, else the default.
+    A LISTEN alone is not enough: without the triggers nothing would ever NOTIFY.
+    """
+    listener = get_change_listener(connection_name) if live_enabled() else None
+    if listener is not None and listener.connected and listener.triggers_installed:
+        return LIVE_CACHE_TTL
+    return None
+
+
+def notify_trigger_statements(tables: list[str], channel: str = CHANNEL) -> list:
+    """Statement-level AFTER trigger on each table: one NOTIFY per writing statement."""
+    statements = [(f"""
+        CREATE OR REPLACE FUNCTION notify_{channel}() RETURNS trigger AS $$
+        BEGIN
+            PERFORM pg_notify('{channel}', TG_TABLE_SCHEMA || '.' || TG_TABLE_NAME);
+            RETURN NULL;
+        END
+        $$ LANGUAGE plpgsql
+    """, None)]
+    for table in tables:
+        trigger = trigger_name(table, channel)
+        statements += [
+            (f'DROP TRIGGER IF EXISTS "{trigger}" ON {table}', None),
+            (f'CREATE TRIGGER "{trigger}" AFTER INSERT OR UPDATE OR DELETE OR TRUNCATE ON {table} '
+             f'FOR EACH STATEMENT EXECUTE FUNCTION notify_{channel}()', None),
+        ]
+    return statements
+
+
+def main():
+    from database.db_manager import DatabaseManager
+
+    parser = argparse.ArgumentParser(description="Postgres LISTEN/NOTIFY setup for live dashboard refresh")
+    parser.add_argument("--install-triggers", action="store_true", help="create the NOTIFY triggers")
+    parser.add_argument("--connection", default="dashboard_db", help="connection name in secrets.toml")
+    args = parser.parse_args()
+
+    if not args.install_triggers:
+        parser.print_help()
+        return
+
+    tables = notified_tables()
+    ok, message = DatabaseManager(args.connection).execute_script(notify_trigger_statements(tables))
+    print(f"{message} ({', '.join(tables)} -> channel '{CHANNEL}')")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,254 @@
+"""
+In-process query metrics for DatabaseManager.
+
+Every read / write records wall time, rows, DataFrame bytes, connection-checkout
+wait and the calling page into a process-wide registry:
+  - latency histograms per (operation, page) and checkout histograms per connection
+  - live pool gauges (checked out, overflow, ...) of every engine created by get_engine
+  - Plotly payload sizes per (page, chart), see utils/charts.py
+  - per-statement aggregates (calls, total / max time, rows)
+  - a ring buffer of the slowest recent statements
+Dumps as Prometheus text or JSON (see pages/Query_Metrics.py).
+"""
+import json
+import math
+import os
+import sys
+import threading
+import time
+from collections import deque
+
+import streamlit as st
+import config
+from database.query_cache import normalize_sql
+
+BUCKETS_MS = (5, 10, 25, 50, 100, 250, 500, 1000, 2500, 5000, 10000, math.inf)
+SLOW_QUERY_MS = getattr(config, "SLOW_QUERY_MS", 500)
+SLOW_LOG_SIZE = getattr(config, "SLOW_QUERY_LOG_SIZE", 200)
+MAX_TRACKED_STATEMENTS = 1000
+
+_APP_DIR = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+_PAGES_DIR = os.path.join(_APP_DIR, "pages")
+
+
+def calling_page() -> str:
+    """Name of the Streamlit page script on the current call stack."""
+    frame = sys._getframe(1)
+    while frame is not None:
+        path = frame.f_code.co_filename
+        if path.startswith(_PAGES_DIR) or os.path.basename(path) == "Login.py":
+            return os.path.splitext(os.path.basename(path))[0]
+        frame = frame.f_back
+    return "unknown"
+
+
+def pool_gauges(pool) -> dict:
+    """Current counters of a connection pool; QueuePool exposes them, other pool classes do not."""
+    gauges = {}
+    for name in ("size", "checkedin", "checkedout", "overflow"):
+        if hasattr(pool, name):
+            gauges[name] = getattr(pool, name)()
+    if hasattr(pool, "_max_overflow"):
+        gauges["max_overflow"] = pool._max_overflow
+    if hasattr(pool, "timeout"):
+        gauges["timeout"] = pool.timeout()
+    return gauges
+
+
+class Histogram:
+    def __init__(self, buckets=BUCKETS_MS):
+        self.buckets = buckets
+        self.counts = [0] * len(buckets)
+        self.count = 0
+        self.sum = 0.0
+
+    def observe(self, value: float):
+        self.count += 1
+        self.sum += value
+        for idx, bound in enumerate(self.buckets):
+            if value <= bound:
+                self.counts[idx] += 1
+                break
+
+    def to_dict(self) -> dict:
+        return {
+            "buckets": {("+Inf" if math.isinf(b) else b): c for b, c in zip(self.buckets, self.counts)},
+            "count": self.count,
+            "sum": round(self.sum, 3),
+        }
+
+
+class MetricsRegistry:
+    def __init__(self, slow_query_ms: float = SLOW_QUERY_MS, slow_log_size: int = SLOW_LOG_SIZE):
+        self.slow_query_ms = slow_query_ms
+        self.started_at = time.time()
+        self._lock = threading.Lock()
+        self._latency = {}     # (operation, page) -> Histogram
+        self._checkout = {}    # connection -> Histogram
+        self._statements = {}  # (connection, sql) -> aggregate dict
+        self._cache_hits = {}  # page -> hits served without touching the database
+        self._compaction = {}  # connection -> {"frames", "bytes_before", "bytes_after"}
+        self._pools = {}       # connection -> SQLAlchemy pool, read live on every snapshot
+        self._charts = {}      # (page, chart) -> {"renders", "cached", "bytes", "last_bytes"}
+        self._slow = deque(maxlen=slow_log_size)
+
+    def record(self, operation: str, connection: str, query: str, wall_ms: float,
+               rows: int = 0, nbytes: int = 0, checkout_ms: float = None,
+               page: str = None, error: str = None):
+        page = page or "unknown"
+        sql = normalize_sql(query)
+        with self._lock:
+            self._latency.setdefault((operation, page), Histogram()).observe(wall_ms)
+            if checkout_ms is not None:
+                self._checkout.setdefault(connection, Histogram()).observe(checkout_ms)
+
+            stats = self._statements.get((connection, sql))
+            if stats is None:
+                if len(self._statements) >= MAX_TRACKED_STATEMENTS:
+                    # Forget the least-called statement to bound memory
+                    coldest = min(self._statements, key=lambda k: self._statements[k]["calls"])
+                    del self._statements[coldest]
+                stats = self._statements[(connection, sql)] = {
+                    "connection": connection, "query": sql, "operation": operation,
+                    "pages": set(), "calls": 0, "errors": 0,
+                    "total_ms": 0.0, "max_ms": 0.0, "rows": 0, "bytes": 0,
+                }
+            stats["pages"].add(page)
+            stats["calls"] += 1
+            stats["errors"] += 1 if error else 0
+            stats["total_ms"] += wall_ms
+            stats["max_ms"] = max(stats["max_ms"], wall_ms)
+            stats["rows"] += rows
+            stats["bytes"] += nbytes
+
+            if wall_ms >= self.slow_query_ms:
+                self._slow.append({
+                    "at": time.strftime("%Y-%m-%d %H:%M:%S"),
+                    "connection": connection, "page": page, "operation": operation,
+                    "wall_ms": round(wall_ms, 1), "checkout_ms": round(checkout_ms or 0, 1),
+                    "rows": rows, "bytes": nbytes, "error": error, "query": sql,
+                })
+
+    def record_latency(self, operation: str, page: str, wall_ms: float):
+        """Latency of something that is not a statement (e.g. submit -> refreshed view), per page."""
+        with self._lock:
+            self._latency.setdefault((operation, page or "unknown"), Histogram()).observe(wall_ms)
+
+    def record_chart(self, page: str, chart: str, nbytes: int, cached: bool):
+        with self._lock:
+            stats = self._charts.setdefault(
+                (page or "unknown", chart), {"renders": 0, "cached": 0, "bytes": 0, "last_bytes": 0}
+            )
+            stats["renders"] += 1
+            stats["cached"] += 1 if cached else 0
+            stats["bytes"] += nbytes
+            stats["last_bytes"] = nbytes
+
+    def record_cache_hit(self, page: str = None):
+        with self._lock:
+            page = page or "unknown"
+            self._cache_hits[page] = self._cache_hits.get(page, 0) + 1
+
+    def record_compaction(self, connection: str, bytes_before: int, bytes_after: int):
+        with self._lock:
+            stats = self._compaction.setdefault(connection, {"frames": 0, "bytes_before": 0, "bytes_after": 0})
+            stats["frames"] += 1
+            stats["bytes_before"] += bytes_before
+            stats["bytes_after"] += bytes_after
+
+    def track_pool(self, connection: str, pool):
+        with self._lock:
+            self._pools[connection] = pool
+
+    def pool_stats(self) -> dict:
+        with self._lock:
+            pools = dict(self._pools)
+        return {conn: pool_gauges(pool) for conn, pool in pools.items()}
+
+    def top_queries(self, n: int = 10, by: str = "max_ms") -> list[dict]:
+        with self._lock:
+            rows = [
+                {**s, "pages": ", ".join(sorted(s["pages"])),
+                 "avg_ms": s["total_ms"] / s["calls"] if s["calls"] else 0.0}
+                for s in self._statements.values()
+            ]
+        return sorted(rows, key=lambda r: r[by], reverse=True)[:n]
+
+    def slow_queries(self) -> list[dict]:
+        with self._lock:
+            return list(reversed(self._slow))
+
+    def snapshot(self) -> dict:
+        with self._lock:
+            return {
+                "started_at": self.started_at,
+                "latency_ms": {f"{op}|{page}": h.to_dict() for (op, page), h in self._latency.items()},
+                "checkout_ms": {conn: h.to_dict() for conn, h in self._checkout.items()},
+                "cache_hits": dict(self._cache_hits),
+                "compaction": {conn: dict(stats) for conn, stats in self._compaction.items()},
+                "slow_queries": list(self._slow),
+                "pools": {conn: pool_gauges(pool) for conn, pool in self._pools.items()},
+                "charts": {f"{chart}|{page}": dict(stats) for (page, chart), stats in self._charts.items()},
+            }
+
+    def to_json(self) -> str:
+        data = self.snapshot()
+        data["top_queries"] = self.top_queries(50)
+        return json.dumps(data, indent=2, default=str)
+
+    def to_prometheus(self) -> str:
+        """Prometheus text exposition format."""
+        lines = []
+
+        def histogram(name, help_text, series):
+            lines.append(f"# HELP {name} {help_text}")
+            lines.append(f"# TYPE {name} histogram")
+            for labels, hist in series:
+                label_str = ",".join(f'{k}="{v}"' for k, v in labels.items())
+                cumulative = 0
+                for bound, count in zip(hist.buckets, hist.counts):
+                    cumulative += count
+                    le = "+Inf" if math.isinf(bound) else bound
+                    lines.append(f'{name}_bucket{{{label_str},le="{le}"}} {cumulative}')
+                lines.append(f"{name}_sum{{{label_str}}} {hist.sum:.3f}")
+                lines.append(f"{name}_count{{{label_str}}} {hist.count}")
+
+        with self._lock:
+            histogram(
+                "db_query_duration_ms", "Query wall time in milliseconds",
+                [({"operation": op, "page": page}, h) for (op, page), h in self._latency.items()]
+            )
+            histogram(
+                "db_connection_checkout_ms", "Time waiting for a pooled connection in milliseconds",
+                [({"connection": conn}, h) for conn, h in self._checkout.items()]
+            )
+            lines.append("# HELP db_query_cache_hits_total Reads served from the query cache")
+            lines.append("# TYPE db_query_cache_hits_total counter")
+            for page, hits in self._cache_hits.items():
+                lines.append(f'db_query_cache_hits_total{{page="{page}"}} {hits}')
+            lines.append("# HELP db_compaction_saved_bytes_total Bytes saved by dtype compaction of fetched frames")
+            lines.append("# TYPE db_compaction_saved_bytes_total counter")
+            for conn, stats in self._compaction.items():
+                saved = stats["bytes_before"] - stats["bytes_after"]
+                lines.append(f'db_compaction_saved_bytes_total{{connection="{conn}"}} {saved}')
+            lines.append("# HELP ui_chart_payload_bytes_total Plotly JSON bytes sent to browsers")
+            lines.append("# TYPE ui_chart_payload_bytes_total counter")
+            for (page, chart), stats in self._charts.items():
+                lines.append(f'ui_chart_payload_bytes_total{{page="{page}",chart="{chart}"}} {stats["bytes"]}')
+            for gauge, help_text in (("size", "Connections the pool keeps open"),
+                                     ("checkedout", "Pooled connections currently in use"),
+                                     ("checkedin", "Idle connections in the pool"),
+                                     ("overflow", "Connections open beyond the pool size")):
+                lines.append(f"# HELP db_pool_{gauge} {help_text}")
+                lines.append(f"# TYPE db_pool_{gauge} gauge")
+                for conn, pool in self._pools.items():
+                    value = pool_gauges(pool).get(gauge)
+                    if value is not None:
+                        lines.append(f'db_pool_{gauge}{{connection="{conn}"}} {value}')
+        return "\n".join(lines) + "\n"
+
+
+@st.cache_resource
+def get_metrics_registry() -> MetricsRegistry:
+    """One registry per process, shared by every session."""
+    return MetricsRegistry()
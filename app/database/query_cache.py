@@ -0,0 +1,216 @@
+import re
+import threading
+import time
+import weakref
+from collections import OrderedDict, deque
+
+import pandas as pd
+import streamlit as st
+import config
+
+DEFAULT_TTL_SECONDS = 60
+DEFAULT_MAX_MB = 256
+MAX_TRACKED_DATASETS = 1000
+
+# Matches the table that follows FROM / JOIN / INTO / UPDATE / TRUNCATE,
+# including schema-qualified and double-quoted names.
+_TABLE_PATTERN = re.compile(
+    r'\b(from|join|into|update|truncate(?:\s+table)?)\s+((?:"[^"]+"|[\w$]+)(?:\s*\.\s*(?:"[^"]+"|[\w$]+))?)',
+    re.IGNORECASE,
+)
+_WRITE_PATTERN = re.compile(
+    r'\b(?:insert\s+into|update|delete\s+from|truncate(?:\s+table)?)\s+((?:"[^"]+"|[\w$]+)(?:\s*\.\s*(?:"[^"]+"|[\w$]+))?)',
+    re.IGNORECASE,
+)
+
+
+def normalize_sql(query: str) -> str:
+    """Collapses whitespace so formatting differences share one cache entry."""
+    return " ".join(query.split())
+
+
+def normalize_table(name: str) -> str:
+    name = name.replace('"', '').replace(" ", "").lower()
+    # 'public.t' and 't' refer to the same table
+    if name.startswith("public."):
+        name = name[len("public."):]
+    return name
+
+
+def tables_in(query: str) -> set[str]:
+    """Returns every table a query reads from or writes to."""
+    return {normalize_table(m.group(2)) for m in _TABLE_PATTERN.finditer(query)}
+
+
+def tables_written(query: str) -> set[str]:
+    """Returns the tables modified by an INSERT / UPDATE / DELETE / TRUNCATE."""
+    return {normalize_table(m.group(1)) for m in _WRITE_PATTERN.finditer(query)}
+
+
+def frame_bytes(df: pd.DataFrame) -> int:
+    """Memory held by a DataFrame, including Python string payloads."""
+    return int(df.memory_usage(index=True, deep=True).sum())
+
+
+def make_key(connection_name: str, query: str, params: dict = None, variant: str = None) -> tuple:
+    """Cache key: connection + normalized SQL + bound params (+ variant, e.g. the read backend)."""
+    frozen_params = tuple(sorted((k, repr(v)) for k, v in (params or {}).items()))
+    key = (connection_name, normalize_sql(query), frozen_params)
+    return key + (variant,) if variant else key
+
+
+class QueryCache:
+    """
+    Process-wide, thread-safe store of query results shared by every session.
+
+    Frames are stored once and handed out as copy-on-write views (see
+    mode.copy_on_write in utils/init_db.py): 30 sessions reading the same result share one
+    copy of the data, and a session that modifies its frame only copies the
+    columns it touches. Views are reference-counted (weakref finalizers) so
+    the store knows which datasets are in use; once the memory budget is
+    exceeded, unreferenced entries are evicted least-recently-used first.
+    Hits and misses are tracked per dataset.
+    """
+
+    def __init__(self, max_bytes: int = DEFAULT_MAX_MB * 1024 * 1024):
+        self.max_bytes = max_bytes
+        self._entries = OrderedDict()  # key -> (expires_at, nbytes, tables, df, serial)
+        self._lock = threading.Lock()
+        self._bytes = 0
+        self.hits = 0
+        self.misses = 0
+        self._serial = 0
+        self._refs = {}           # entry serial -> live views handed out
+        self._released = deque()  # serials of collected views; appended by finalizers, drained under the lock
+        self._datasets = {}       # key -> {"hits", "misses", "bytes", "last_used"}
+
+    def get(self, key: tuple):
+        """Returns a copy-on-write view of the cached DataFrame, or None on miss/expiry."""
+        with self._lock:
+            self._drain_released()
+            entry = self._entries.get(key)
+            if entry is not None and entry[0] <= time.monotonic():
+                self._drop(key)
+                entry = None
+
+            stats = self._dataset_stats(key)
+            stats["last_used"] = time.time()
+            if entry is None:
+                self.misses += 1
+                stats["misses"] += 1
+                return None
+
+            _, _, _, df, serial = entry
+            self._entries.move_to_end(key)
+            self.hits += 1
+            stats["hits"] += 1
+            self._refs[serial] = self._refs.get(serial, 0) + 1
+
+        view = df.copy(deep=False)
+        weakref.finalize(view, self._released.append, serial)
+        return view
+
+    def put(self, key: tuple, df: pd.DataFrame, ttl: float, tables: set[str], nbytes: int = None):
+        if ttl <= 0:
+            return
+
+        nbytes = frame_bytes(df) if nbytes is None else nbytes
+        if nbytes > self.max_bytes:
+            return  # Never let one huge result flush the whole cache
+
+        with self._lock:
+            self._drain_released()
+            if key in self._entries:
+                self._drop(key)
+            self._serial += 1
+            # Shallow copy: with copy-on-write the caller's later edits never reach the stored frame
+            self._entries[key] = (time.monotonic() + ttl, nbytes, frozenset(tables), df.copy(deep=False), self._serial)
+            self._bytes += nbytes
+            self._dataset_stats(key)["bytes"] = nbytes
+
+            while self._bytes > self.max_bytes and len(self._entries) > 1:
+                # Entries still referenced by a session free nothing when dropped: evict the others first
+                idle = (k for k, e in self._entries.items() if not self._refs.get(e[4]) and k != key)
+                self._drop(next(idle, None) or next(iter(self._entries)))
+
+    def invalidate(self, tables: set[str] = None, connection_name: str = None) -> int:
+        """
+        Drops entries touching any of `tables` (all entries when None),
+        optionally restricted to one connection. Returns the number dropped.
+        """
+        targets = {normalize_table(t) for t in tables} if tables is not None else None
+
+        with self._lock:
+            stale = [
+                key for key, (_, _, entry_tables, _, _) in self._entries.items()
+                if (connection_name is None or key[0] == connection_name)
+                and (targets is None or entry_tables & targets)
+            ]
+            for key in stale:
+                self._drop(key)
+        return len(stale)
+
+    def stats(self) -> dict:
+        with self._lock:
+            self._drain_released()
+            in_use = [e for e in self._entries.values() if self._refs.get(e[4])]
+            return {
+                "entries": len(self._entries),
+                "bytes": self._bytes,
+                "max_bytes": self.max_bytes,
+                "hits": self.hits,
+                "misses": self.misses,
+                "shared_views": sum(self._refs.get(e[4], 0) for e in self._entries.values()),
+                "in_use_entries": len(in_use),
+                "in_use_bytes": sum(e[1] for e in in_use),
+            }
+
+    def datasets(self, n: int = 50) -> list[dict]:
+        """Per-dataset statistics (most hits first): cached or not, size, live views, hits / misses."""
+        with self._lock:
+            self._drain_released()
+            rows = []
+            for key, stats in self._datasets.items():
+                entry = self._entries.get(key)
+                rows.append({
+                    "connection": key[0],
+                    "query": key[1],
+                    "params": ", ".join(f"{k}={v}" for k, v in key[2]),
+                    "cached": entry is not None,
+                    "views": self._refs.get(entry[4], 0) if entry else 0,
+                    **stats,
+                })
+        return sorted(rows, key=lambda r: r["hits"], reverse=True)[:n]
+
+    def _dataset_stats(self, key: tuple) -> dict:
+        stats = self._datasets.get(key)
+        if stats is None:
+            if len(self._datasets) >= MAX_TRACKED_DATASETS:
+                # Forget the least-used dataset that is no longer cached
+                coldest = min(
+                    (k for k in self._datasets if k not in self._entries),
+                    key=lambda k: self._datasets[k]["hits"] + self._datasets[k]["misses"], default=None
+                )
+                self._datasets.pop(coldest, None)
+            stats = self._datasets[key] = {"hits": 0, "misses": 0, "bytes": 0, "last_used": time.time()}
+        return stats
+
+    def _drain_released(self):
+        while self._released:
+            serial = self._released.popleft()
+            remaining = self._refs.get(serial, 0) - 1
+            if remaining > 0:
+                self._refs[serial] = remaining
+            else:
+                self._refs.pop(serial, None)
+
+    def _drop(self, key: tuple):
+        _, nbytes, _, _, _ = self._entries.pop(key)
+        self._bytes -= nbytes
+
+
+@st.cache_resource
+def get_query_cache() -> QueryCache:
+    """One cache per process, shared by every session and page."""
+    max_mb = getattr(config, "QUERY_CACHE_MAX_MB", DEFAULT_MAX_MB)
+    return QueryCache(max_bytes=int(max_mb * 1024 * 1024))
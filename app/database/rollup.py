@@ -0,0 +1,278 @@
+"""
+Daily platform rollup for the social media monitoring table.
+
+Keeps one row per (platform, mention_date) in a summary table and refreshes it
+incrementally: only the (platform, mention_date) groups that contain rows with
+last_updated >= the stored watermark are recomputed, plus the groups rows were
+deleted from or moved between (logged by a trigger into DIRTY_TABLE).
+
+The watermark trails the newest row by WATERMARK_LAG_SECONDS: a scraper
+transaction that commits after a refresh but stamped its rows earlier (its
+now()) is still picked up by the next refresh, as long as it ran for less
+than the lag. TRUNCATE of the source table is not logged; rebuild with --full.
+
+Create the rollup objects once (needs DDL rights), then refresh from cron /
+the scrapers (run from the app/ folder):
+    python -m database.rollup --setup
+    python -m database.rollup [--full] [--connection dashboard_db]
+"""
+import argparse
+import threading
+import time
+from datetime import date
+
+import streamlit as st
+import config
+
+SOURCE_TABLE = config.SOCIAL_MEDIA_MONITORING_TABLE
+ROLLUP_TABLE = getattr(config, "SOCIAL_MEDIA_ROLLUP_TABLE", f"{SOURCE_TABLE}_daily")
+WATERMARK_TABLE = getattr(config, "ROLLUP_WATERMARK_TABLE", "rollup_watermarks")
+DIRTY_TABLE = getattr(config, "SOCIAL_MEDIA_ROLLUP_DIRTY_TABLE", f"{ROLLUP_TABLE}_dirty")
+WATERMARK_LAG_SECONDS = getattr(config, "ROLLUP_WATERMARK_LAG_SECONDS", 600)
+REFRESH_CONNECTION = getattr(config, "ROLLUP_REFRESH_CONNECTION", "dashboard_db")
+# Dashboards refresh the rollup themselves at most this often (0 = only via the CLI)
+AUTO_REFRESH_SECONDS = getattr(config, "ROLLUP_AUTO_REFRESH_SECONDS", 300)
+
+
+def _setup_statements() -> list:
+    base_name = SOURCE_TABLE.split(".")[-1]
+    index_name = f"{base_name}_last_updated_idx"
+    trigger = f"{base_name}_rollup_dirty"
+    # The trigger function lives next to the source table
+    function = f"{SOURCE_TABLE.rsplit('.', 1)[0]}.{trigger}" if "." in SOURCE_TABLE else trigger
+    return [
+        (f"""
+            CREATE TABLE IF NOT EXISTS {ROLLUP_TABLE} (
+                platform TEXT NOT NULL,
+                mention_date DATE NOT NULL,
+                total_scraped BIGINT NOT NULL DEFAULT 0,
+                total_filtered BIGINT NOT NULL DEFAULT 0,
+                success_count BIGINT NOT NULL DEFAULT 0,
+                row_count BIGINT NOT NULL DEFAULT 0,
+                last_updated TIMESTAMP,
+                scraping_status TEXT,
+                PRIMARY KEY (platform, mention_date)
+            )
+        """, None),
+        (f"""
+            CREATE TABLE IF NOT EXISTS {WATERMARK_TABLE} (
+                name TEXT PRIMARY KEY,
+                watermark TIMESTAMP,
+                refreshed_at TIMESTAMP
+            )
+        """, None),
+        (f"""
+            CREATE TABLE IF NOT EXISTS {DIRTY_TABLE} (
+                platform TEXT NOT NULL,
+                mention_date DATE NOT NULL,
+                marked_at TIMESTAMP NOT NULL DEFAULT NOW(),
+                PRIMARY KEY (platform, mention_date)
+            )
+        """, None),
+        # The incremental scan relies on this index
+        (f"CREATE INDEX IF NOT EXISTS {index_name} ON {SOURCE_TABLE} (last_updated)", None),
+        # Deleted / moved rows leave no trace in last_updated: log the groups they left (and entered).
+        # DO UPDATE (not DO NOTHING) so a refresh that already read the marker conflicts
+        # with this write instead of deleting it unseen.
+        (f"""
+            CREATE OR REPLACE FUNCTION {function}() RETURNS trigger AS $$
+            BEGIN
+                IF TG_OP = 'UPDATE' AND OLD.platform IS NOT DISTINCT FROM NEW.platform
+                        AND OLD.mention_date IS NOT DISTINCT FROM NEW.mention_date THEN
+                    RETURN NULL;
+                END IF;
+                INSERT INTO {DIRTY_TABLE} (platform, mention_date)
+                VALUES (OLD.platform, OLD.mention_date)
+                ON CONFLICT (platform, mention_date) DO UPDATE SET marked_at = EXCLUDED.marked_at;
+                IF TG_OP = 'UPDATE' THEN
+                    INSERT INTO {DIRTY_TABLE} (platform, mention_date)
+                    VALUES (NEW.platform, NEW.mention_date)
+                    ON CONFLICT (platform, mention_date) DO UPDATE SET marked_at = EXCLUDED.marked_at;
+                END IF;
+                RETURN NULL;
+            END
+            $$ LANGUAGE plpgsql
+        """, None),
+        (f'DROP TRIGGER IF EXISTS "{trigger}" ON {SOURCE_TABLE}', None),
+        (f'CREATE TRIGGER "{trigger}" AFTER DELETE OR UPDATE OF platform, mention_date ON {SOURCE_TABLE} '
+         f'FOR EACH ROW EXECUTE FUNCTION {function}()', None),
+    ]
+
+
+def _refresh_statements(full: bool = False) -> list:
+    statements = []
+    if full:
+        statements += [
+            (f"DELETE FROM {ROLLUP_TABLE}", None),
+            (f"DELETE FROM {WATERMARK_TABLE} WHERE name = :name", {"name": ROLLUP_TABLE}),
+            (f"DELETE FROM {DIRTY_TABLE}", None),
+        ]
+
+    # Recompute every group touched since the watermark (all groups on first run)
+    # and every group rows were deleted from or moved between
+    statements.append((f"""
+        WITH changed AS (
+            SELECT platform, mention_date
+            FROM {SOURCE_TABLE}
+            WHERE last_updated >= COALESCE(
+                (SELECT watermark FROM {WATERMARK_TABLE} WHERE name = :name),
+                '-infinity'::timestamp
+            )
+            UNION
+            SELECT platform, mention_date FROM {DIRTY_TABLE}
+        )
+        INSERT INTO {ROLLUP_TABLE} AS r (
+            platform, mention_date, total_scraped, total_filtered,
+            success_count, row_count, last_updated, scraping_status
+        )
+        SELECT
+            s.platform,
+            s.mention_date,
+            COALESCE(SUM(s.scraped_count), 0),
+            COALESCE(SUM(s.filtered_count), 0),
+            COUNT(*) FILTER (WHERE s.scraping_status = 'SUCCESS'),
+            COUNT(*),
+            MAX(s.last_updated),
+            MAX(s.scraping_status)
+        FROM {SOURCE_TABLE} s
+        JOIN changed c ON s.platform = c.platform AND s.mention_date = c.mention_date
+        GROUP BY s.platform, s.mention_date
+        ON CONFLICT (platform, mention_date) DO UPDATE SET
+            total_scraped = EXCLUDED.total_scraped,
+            total_filtered = EXCLUDED.total_filtered,
+            success_count = EXCLUDED.success_count,
+            row_count = EXCLUDED.row_count,
+            last_updated = EXCLUDED.last_updated,
+            scraping_status = EXCLUDED.scraping_status
+    """, {"name": ROLLUP_TABLE}))
+
+    # Groups left without any source row
+    statements += [
+        (f"""
+            DELETE FROM {ROLLUP_TABLE} r
+            USING {DIRTY_TABLE} d
+            WHERE r.platform = d.platform AND r.mention_date = d.mention_date
+              AND NOT EXISTS (
+                  SELECT 1 FROM {SOURCE_TABLE} s
+                  WHERE s.platform = d.platform AND s.mention_date = d.mention_date
+              )
+        """, None),
+        # Only the markers this snapshot saw; later ones wait for the next refresh
+        (f"DELETE FROM {DIRTY_TABLE}", None),
+    ]
+
+    # Lagged watermark: rows committed late with an older last_updated are rescanned.
+    # LEAST() guards against last_updated values ahead of the database clock.
+    statements.append((f"""
+        INSERT INTO {WATERMARK_TABLE} AS w (name, watermark, refreshed_at)
+        SELECT :name, LEAST(MAX(last_updated), LOCALTIMESTAMP) - make_interval(secs => :lag), NOW()
+        FROM {SOURCE_TABLE}
+        ON CONFLICT (name) DO UPDATE SET
+            watermark = COALESCE(EXCLUDED.watermark, w.watermark),
+            refreshed_at = EXCLUDED.refreshed_at
+    """, {"name": ROLLUP_TABLE, "lag": WATERMARK_LAG_SECONDS}))
+    return statements
+
+
+def setup_rollup(db) -> tuple[bool, str]:
+    """
+    Creates the rollup tables, the last_updated index and the dirty-group trigger.
+    One-time step (CLI --setup): CREATE INDEX locks the scraper table and needs DDL rights.
+    """
+    return db.execute_script(_setup_statements())
+
+
+def refresh_rollup(db, full: bool = False) -> tuple[bool, str]:
+    """
+    Applies an incremental refresh (the objects must exist, see setup_rollup).
+    Runs in one REPEATABLE READ transaction so the aggregates, the cleared
+    dirty markers and the new watermark all come from the same snapshot.
+    """
+    return db.execute_script(_refresh_statements(full), isolation_level="REPEATABLE READ")
+
+
+@st.cache_resource
+def _refresh_state() -> dict:
+    """Process-wide throttle shared by all sessions."""
+    return {"last_run": 0.0, "lock": threading.Lock()}
+
+
+def refresh_if_due(db, interval: float = AUTO_REFRESH_SECONDS):
+    """Refreshes the rollup at most once per `interval` seconds across all sessions."""
+    if interval <= 0:
+        return None
+
+    state = _refresh_state()
+    if time.monotonic() - state["last_run"] < interval:
+        return None
+    # Another session is already refreshing; it will serve everyone
+    if not state["lock"].acquire(blocking=False):
+        return None
+    try:
+        result = refresh_rollup(db)
+        state["last_run"] = time.monotonic()
+        return result
+    finally:
+        state["lock"].release()
+
+
+# --- Read queries used by the dashboards: (sql, params) pairs ---
+
+def platform_totals_query(start_date: date, end_date: date) -> tuple[str, dict]:
+    return f"""
+        SELECT
+            platform,
+            SUM(total_scraped) AS total_scraped,
+            SUM(total_filtered) AS total_filtered,
+            SUM(success_count) AS success_count,
+            MAX(last_updated) AS last_updated
+        FROM {ROLLUP_TABLE}
+        WHERE mention_date BETWEEN :start_date AND :end_date
+        GROUP BY platform
+        ORDER BY platform
+    """, {"start_date": start_date, "end_date": end_date}
+
+
+def daily_trend_query(start_date: date, end_date: date) -> tuple[str, dict]:
+    return f"""
+        SELECT mention_date AS "Date", platform, total_scraped AS count
+        FROM {ROLLUP_TABLE}
+        WHERE mention_date BETWEEN :start_date AND :end_date
+        ORDER BY mention_date, platform
+    """, {"start_date": start_date, "end_date": end_date}
+
+
+def platform_status_query(days: int = 7) -> tuple[str, dict]:
+    return f"""
+        SELECT platform, MAX(last_updated) AS last_updated, MAX(scraping_status) AS status
+        FROM {ROLLUP_TABLE}
+        WHERE mention_date >= CURRENT_DATE - :days
+        GROUP BY platform
+        ORDER BY last_updated DESC
+    """, {"days": days}
+
+
+def main():
+    from database.db_manager import DatabaseManager
+
+    parser = argparse.ArgumentParser(description=f"Refresh {ROLLUP_TABLE} from {SOURCE_TABLE}")
+    parser.add_argument("--setup", action="store_true", help="create the rollup tables, index and trigger first")
+    parser.add_argument("--full", action="store_true", help="drop the watermark and rebuild every group")
+    parser.add_argument("--connection", default=REFRESH_CONNECTION, help="connection name in secrets.toml")
+    args = parser.parse_args()
+
+    db = DatabaseManager(args.connection)
+    if args.setup:
+        ok, message = setup_rollup(db)
+        print(f"Setup: {message}")
+        if not ok:
+            raise SystemExit(1)
+
+    started = time.perf_counter()
+    ok, message = refresh_rollup(db, full=args.full)
+    print(f"{message} ({time.perf_counter() - started:.2f}s)")
+    raise SystemExit(0 if ok else 1)
+
+
+if __name__ == "__main__":
+    main()
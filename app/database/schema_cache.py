@@ -0,0 +1,119 @@
+"""
+Cached table metadata (column types, nullability, defaults, primary keys).
+
+All tables in config.MANAGEMENT_TABLES are loaded with ONE bulk catalog query
+and kept per (connection, schema, table) until the TTL expires or refresh()
+is called, so building the Data Management forms never hits information_schema
+on a rerun.
+"""
+import threading
+import time
+
+import pandas as pd
+import streamlit as st
+import config
+
+SCHEMA_CACHE_TTL = getattr(config, "SCHEMA_CACHE_TTL", 3600)
+
+SCHEMA_COLUMNS = [
+    'column_name', 'data_type', 'is_nullable', 'column_default', 'is_primary_key', 'ordinal_position'
+]
+
+_CATALOG_QUERY = """
+    SELECT
+        c.table_schema,
+        c.table_name,
+        c.column_name,
+        c.data_type,
+        c.is_nullable = 'YES' AS is_nullable,
+        c.column_default,
+        pk.column_name IS NOT NULL AS is_primary_key,
+        c.ordinal_position
+    FROM information_schema.columns c
+    LEFT JOIN (
+        SELECT kcu.table_schema, kcu.table_name, kcu.column_name
+        FROM information_schema.table_constraints tc
+        JOIN information_schema.key_column_usage kcu
+          ON kcu.constraint_name = tc.constraint_name
+         AND kcu.table_schema = tc.table_schema
+         AND kcu.table_name = tc.table_name
+        WHERE tc.constraint_type = 'PRIMARY KEY'
+    ) pk
+      ON pk.table_schema = c.table_schema
+     AND pk.table_name = c.table_name
+     AND pk.column_name = c.column_name
+    WHERE (c.table_schema || '.' || c.table_name) = ANY(:qualified_names)
+    ORDER BY c.table_schema, c.table_name, c.ordinal_position
+"""
+
+
+def split_table_name(table: str) -> tuple[str, str]:
+    """'schema.table' -> ('schema', 'table'); unqualified names live in 'public'."""
+    return tuple(table.split(".", 1)) if "." in table else ('public', table)
+
+
+class SchemaCache:
+    def __init__(self, ttl: float = SCHEMA_CACHE_TTL):
+        self.ttl = ttl
+        self._tables = {}     # (connection, schema, table) -> DataFrame
+        self._loaded_at = {}  # connection -> monotonic time of the last bulk load
+        self._lock = threading.Lock()
+
+    def get(self, db, table: str) -> pd.DataFrame:
+        """Columns of `table` (see SCHEMA_COLUMNS); empty if the table does not exist."""
+        key = (db.connection_name, *split_table_name(table))
+        with self._lock:
+            loaded_at = self._loaded_at.get(db.connection_name)
+            fresh = loaded_at is not None and time.monotonic() - loaded_at < self.ttl
+            cached = self._tables.get(key) if fresh else None
+        if cached is not None:
+            return cached
+
+        # Load every managed table (plus this one) in a single catalog round trip
+        self.load(db, list(config.MANAGEMENT_TABLES.values()) + [table])
+        with self._lock:
+            return self._tables.get(key, pd.DataFrame(columns=SCHEMA_COLUMNS))
+
+    def load(self, db, tables: list[str]) -> bool:
+        """Bulk-loads `tables`; False (and nothing cached) if the catalog read failed."""
+        qualified = sorted({".".join(split_table_name(t)) for t in tables})
+        # ttl=0: this cache owns the lifetime, the query cache must not hold a copy
+        df = db.fetch_data(_CATALOG_QUERY, {"qualified_names": qualified}, ttl=0, compact=False)
+        if 'table_schema' not in df.columns:
+            # fetch_data reports errors as a frame without columns: cache nothing, retry on the next get()
+            return False
+
+        loaded = {}
+        if not df.empty:
+            for (schema_name, table_name), columns in df.groupby(['table_schema', 'table_name'], sort=False, observed=True):
+                loaded[(db.connection_name, schema_name, table_name)] = columns[SCHEMA_COLUMNS].reset_index(drop=True)
+
+        with self._lock:
+            for name in qualified:
+                # Remember missing tables too, so they are not re-queried on every rerun
+                key = (db.connection_name, *split_table_name(name))
+                self._tables[key] = loaded.get(key, pd.DataFrame(columns=SCHEMA_COLUMNS))
+            self._loaded_at[db.connection_name] = time.monotonic()
+        return True
+
+    def refresh(self, connection_name: str = None):
+        """Forgets cached metadata (for one connection or all); the next get() reloads it."""
+        with self._lock:
+            for key in [k for k in self._tables if connection_name in (None, k[0])]:
+                del self._tables[key]
+            for conn in [c for c in self._loaded_at if connection_name in (None, c)]:
+                del self._loaded_at[conn]
+
+
+@st.cache_resource
+def get_schema_cache() -> SchemaCache:
+    """One metadata cache per process, shared by every session."""
+    return SchemaCache()
+
+
+def get_table_schema(db, table: str) -> pd.DataFrame:
+    return get_schema_cache().get(db, table)
+
+
+def primary_key_columns(schema_df: pd.DataFrame) -> list[str]:
+    return schema_df.loc[schema_df['is_primary_key'].astype(bool), 'column_name'].tolist()
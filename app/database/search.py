@@ -0,0 +1,164 @@
+"""
+SQL-side search for the Data Management tabs.
+
+Turns the "Search in column" / "All" UI modes into parameterized ILIKE or
+full-text conditions that Postgres can answer from pg_trgm / tsvector GIN indexes.
+
+Create the matching indexes (run from the app/ folder):
+    python -m database.search --create-indexes [--fulltext]
+They are built with CREATE INDEX CONCURRENTLY, so the scrapers keep writing.
+"""
+import argparse
+
+import pandas as pd
+import config
+
+TEXT_TYPES = ('text', 'character varying', 'character', 'citext')
+INTEGER_TYPES = ('smallint', 'integer', 'bigint')
+TS_CONFIG = 'simple'
+
+SEARCH_MODES = {"Contains": "contains", "Full-text": "fulltext"}
+
+
+def quote_ident(name: str) -> str:
+    return '"' + name.replace('"', '""') + '"'
+
+
+def escape_like(term: str) -> str:
+    """Escapes LIKE wildcards so user input is matched literally."""
+    return term.replace('\\', '\\\\').replace('%', '\\%').replace('_', '\\_')
+
+
+def text_columns(schema_df: pd.DataFrame) -> list[str]:
+    """Columns whose values can be searched (and indexed) without a cast."""
+    mask = schema_df['data_type'].str.lower().isin(TEXT_TYPES)
+    return schema_df.loc[mask, 'column_name'].tolist()
+
+
+def integer_key_columns(schema_df: pd.DataFrame) -> list[str]:
+    """Integer primary key columns (indexed, so an exact match never forces a scan)."""
+    mask = schema_df['data_type'].str.lower().isin(INTEGER_TYPES) & schema_df['is_primary_key'].astype(bool)
+    return schema_df.loc[mask, 'column_name'].tolist()
+
+
+def _tsvector(column: str) -> str:
+    # Must match the index expression in create_search_indexes() exactly
+    return f"to_tsvector('{TS_CONFIG}', coalesce({quote_ident(column)}, ''))"
+
+
+def build_search_filter(schema_df: pd.DataFrame, search_col: str, term: str,
+                        mode: str = "contains") -> tuple[str, dict]:
+    """
+    Returns (where_sql, params) for DatabaseManager.fetch_page.
+    search_col is a column name or "All"; mode is "contains" (ILIKE) or "fulltext".
+
+    "All" only matches the text columns (plus an exact match on integer primary
+    keys for numeric terms): every OR branch must be indexable, or Postgres falls
+    back to scanning the whole table.
+    """
+    searchable = text_columns(schema_df)
+
+    if mode == "fulltext":
+        columns = searchable if search_col == "All" else [search_col]
+        columns = [c for c in columns if c in searchable]
+        if columns:
+            clause = " OR ".join(f"{_tsvector(c)} @@ plainto_tsquery('{TS_CONFIG}', :search_query)" for c in columns)
+            return clause, {"search_query": term}
+        # Non-text column: fall through to a substring match
+
+    params = {"search_pattern": f"%{escape_like(term)}%"}
+    if search_col != "All":
+        # Text columns are compared bare so the trigram index applies
+        target = quote_ident(search_col) if search_col in searchable else f"{quote_ident(search_col)}::text"
+        return f"{target} ILIKE :search_pattern", params
+
+    conditions = [f"{quote_ident(col)} ILIKE :search_pattern" for col in searchable]
+    if term.strip().isdigit() and len(term.strip()) < 19:  # fits in bigint
+        conditions += [f"{quote_ident(col)} = :search_number" for col in integer_key_columns(schema_df)]
+        params["search_number"] = int(term.strip())
+    if not conditions:
+        return "FALSE", {}
+    return " OR ".join(conditions), params
+
+
+def create_search_indexes(db, schema_df_by_table: dict, fulltext: bool = False) -> list[tuple[str, bool, str]]:
+    """
+    Creates pg_trgm GIN indexes (and optionally tsvector GIN indexes) on every
+    text column of the given tables. Returns (index_name, success, message) per index.
+
+    CONCURRENTLY (outside a transaction, hence AUTOCOMMIT) only takes a lock that
+    lets inserts and updates through. A concurrent build that failed leaves an
+    INVALID index behind, which IF NOT EXISTS would keep: those are dropped first.
+    """
+    results = []
+    ok, message = db.execute_query("CREATE EXTENSION IF NOT EXISTS pg_trgm")
+    results.append(("pg_trgm", ok, message))
+    if not ok:
+        return results
+
+    for table, schema_df in schema_df_by_table.items():
+        base_name = table.split(".")[-1]
+        for col in text_columns(schema_df):
+            statements = [(
+                f"{base_name}_{col}_trgm_idx",
+                f"USING gin ({quote_ident(col)} gin_trgm_ops)"
+            )]
+            if fulltext:
+                statements.append((f"{base_name}_{col}_fts_idx", f"USING gin ({_tsvector(col)})"))
+
+            for index_name, definition in statements:
+                index_name = index_name[:63]
+                if index_name in invalid_indexes(db, table, [index_name]):
+                    db.execute_script(
+                        [(f"DROP INDEX CONCURRENTLY IF EXISTS {_qualified_index(table, index_name)}", None)],
+                        isolation_level="AUTOCOMMIT"
+                    )
+                ok, message = db.execute_script(
+                    [(f"CREATE INDEX CONCURRENTLY IF NOT EXISTS {quote_ident(index_name)} ON {table} {definition}", None)],
+                    isolation_level="AUTOCOMMIT"
+                )
+                results.append((index_name, ok, message))
+    return results
+
+
+def _qualified_index(table: str, index_name: str) -> str:
+    # Indexes live in their table's schema
+    schema = table.split(".", 1)[0] if "." in table else "public"
+    return f"{quote_ident(schema)}.{quote_ident(index_name)}"
+
+
+def invalid_indexes(db, table: str, index_names: list[str]) -> list[str]:
+    """The given indexes of `table`'s schema that exist but are INVALID (failed concurrent build)."""
+    schema = table.split(".", 1)[0] if "." in table else "public"
+    df = db.fetch_data("""
+        SELECT c.relname
+        FROM pg_index i
+        JOIN pg_class c ON c.oid = i.indexrelid
+        JOIN pg_namespace n ON n.oid = c.relnamespace
+        WHERE NOT i.indisvalid AND n.nspname = :schema AND c.relname = ANY(:index_names)
+    """, {"schema": schema, "index_names": list(index_names)}, ttl=0)
+    return df["relname"].tolist() if not df.empty else []
+
+
+def main():
+    from database.db_manager import DatabaseManager
+    from database.schema_cache import get_table_schema
+
+    parser = argparse.ArgumentParser(description="Manage search indexes for config.MANAGEMENT_TABLES")
+    parser.add_argument("--create-indexes", action="store_true", help="create pg_trgm GIN indexes")
+    parser.add_argument("--fulltext", action="store_true", help="also create to_tsvector GIN indexes")
+    parser.add_argument("--connection", default="management_db", help="connection name in secrets.toml")
+    args = parser.parse_args()
+
+    if not args.create_indexes:
+        parser.print_help()
+        return
+
+    db = DatabaseManager(args.connection)
+    schemas = {table: get_table_schema(db, table) for table in config.MANAGEMENT_TABLES.values()}
+    for index_name, ok, message in create_search_indexes(db, schemas, fulltext=args.fulltext):
+        print(f"{'OK ' if ok else 'ERR'} {index_name}: {message}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,134 @@
+"""
+Dense time x platform trend matrices for the social media dashboard.
+
+trend_matrix() returns one row per bucket (day or hour) over the WHOLE window,
+one column per platform, zeros where nothing was scraped, plus the running
+totals. Daily buckets come from the rollup table, hourly buckets from
+mention_datetime in the source table.
+
+Small windows read the sparse aggregates and densify them in pandas (unstack,
+reindex, one cumsum(axis=0)). From TREND_SQL_MIN_BUCKETS buckets on, the grid
+is built in SQL instead (generate_series x platforms LEFT JOIN the aggregates,
+running totals as a window function), so pandas only reshapes rows that
+already arrive dense and ordered.
+"""
+from datetime import datetime
+
+import numpy as np
+import pandas as pd
+import config
+from database.rollup import ROLLUP_TABLE, SOURCE_TABLE
+
+TREND_WINDOWS = (7, 30, 90, 365)
+TREND_SQL_MIN_BUCKETS = getattr(config, "TREND_SQL_MIN_BUCKETS", 200)
+
+RESOLUTIONS = {
+    "day": {
+        "table": ROLLUP_TABLE, "time": "mention_date", "value": "total_scraped",
+        "bucket": "CAST(mention_date AS timestamp)", "freq": "D", "step": "1 day",
+    },
+    "hour": {
+        "table": SOURCE_TABLE, "time": "mention_datetime", "value": "scraped_count",
+        "bucket": "date_trunc('hour', mention_datetime)", "freq": "h", "step": "1 hour",
+    },
+}
+
+
+def trend_window(days: int, resolution: str = "day", end: datetime = None) -> pd.DatetimeIndex:
+    """Every bucket of the last `days` days, ending with the current day / hour."""
+    freq = RESOLUTIONS[resolution]["freq"]
+    end = pd.Timestamp(end or datetime.now()).floor(freq)
+    periods = days if resolution == "day" else days * 24
+    return pd.date_range(end=end, periods=periods, freq=freq)
+
+
+def _counts_query(resolution: str, grid: pd.DatetimeIndex, platforms: list = None) -> tuple[str, dict]:
+    """Sparse (bucket, platform, count) aggregates inside the window."""
+    spec = RESOLUTIONS[resolution]
+    stop = grid[-1] + pd.Timedelta(spec["step"])
+    params = {"start": grid[0].to_pydatetime(), "stop": stop.to_pydatetime()}
+    if resolution == "day":
+        params = {name: value.date() for name, value in params.items()}
+
+    platform_filter = ""
+    if platforms is not None:
+        platform_filter = "AND platform = ANY(:platforms)"
+        params["platforms"] = list(platforms)
+
+    return f"""
+        SELECT {spec['bucket']} AS bucket, platform, CAST(SUM({spec['value']}) AS bigint) AS count
+        FROM {spec['table']}
+        WHERE {spec['time']} >= :start AND {spec['time']} < :stop {platform_filter}
+        GROUP BY 1, 2
+    """, params
+
+
+def dense_trend_query(resolution: str, grid: pd.DatetimeIndex, platforms: list = None) -> tuple[str, dict]:
+    """Every (bucket, platform) cell of the window with its count and running total, ordered by bucket."""
+    counts_sql, params = _counts_query(resolution, grid, platforms)
+    params.update(first=grid[0].to_pydatetime(), last=grid[-1].to_pydatetime(), step=RESOLUTIONS[resolution]["step"])
+    platforms_sql = (
+        "SELECT unnest(CAST(:platforms AS text[])) AS platform" if platforms is not None
+        else "SELECT DISTINCT platform FROM counts"
+    )
+    return f"""
+        WITH counts AS ({counts_sql}),
+        grid AS (
+            SELECT generate_series(CAST(:first AS timestamp), CAST(:last AS timestamp), CAST(:step AS interval)) AS bucket
+        ),
+        platforms AS ({platforms_sql})
+        SELECT
+            g.bucket AS "Date",
+            p.platform,
+            COALESCE(c.count, 0) AS count,
+            CAST(SUM(COALESCE(c.count, 0)) OVER (PARTITION BY p.platform ORDER BY g.bucket) AS bigint) AS running,
+            COUNT(c.count) OVER () AS data_cells
+        FROM grid g
+        CROSS JOIN platforms p
+        LEFT JOIN counts c ON c.bucket = g.bucket AND c.platform = p.platform
+        ORDER BY g.bucket, p.platform
+    """, params
+
+
+def _with_date(matrix: pd.DataFrame, grid: pd.DatetimeIndex) -> pd.DataFrame:
+    matrix.columns.name = None
+    matrix.insert(0, "Date", grid)
+    return matrix.reset_index(drop=True)
+
+
+def trend_matrix(db, days: int = 30, resolution: str = "day", platforms: list = None,
+                 end: datetime = None, ttl: float = None) -> tuple[pd.DataFrame, pd.DataFrame]:
+    """
+    Returns (counts, running): DataFrames with a "Date" column (every bucket of the
+    window) and one column per platform (`platforms` in that order, or every platform
+    with data). Both are empty when the window has no data at all.
+    """
+    grid = trend_window(days, resolution, end)
+
+    if len(grid) < TREND_SQL_MIN_BUCKETS:
+        rows = db.fetch_data(*_counts_query(resolution, grid, platforms), ttl=ttl)
+        if rows.empty:
+            return pd.DataFrame(), pd.DataFrame()
+        columns = list(platforms) if platforms is not None else sorted(rows["platform"].unique())
+        counts = (
+            rows.astype({"platform": str})
+            .set_index([pd.DatetimeIndex(rows["bucket"]), "platform"])["count"]
+            .unstack(fill_value=0)
+            .reindex(index=grid, columns=columns, fill_value=0)
+            .astype("int64")
+        )
+        running = counts.cumsum(axis=0)
+        return _with_date(counts, grid), _with_date(running, grid)
+
+    rows = db.fetch_data(*dense_trend_query(resolution, grid, platforms), ttl=ttl)
+    if rows.empty or int(rows["data_cells"].iloc[0]) == 0:
+        return pd.DataFrame(), pd.DataFrame()
+    # Rows arrive dense and ordered (bucket, platform): a reshape, not a pivot
+    n_platforms = len(rows) // len(grid)
+    columns = rows["platform"].astype(str).iloc[:n_platforms].tolist()
+    shape = (len(grid), n_platforms)
+    counts = pd.DataFrame(rows["count"].to_numpy(dtype=np.int64).reshape(shape), columns=columns)
+    running = pd.DataFrame(rows["running"].to_numpy(dtype=np.int64).reshape(shape), columns=columns)
+    if platforms is not None:
+        counts, running = counts[list(platforms)], running[list(platforms)]
+    return _with_date(counts, grid), _with_date(running, grid)
@@ -1,8 +1,11 @@
 import streamlit as st
 import pandas as pd
 import plotly.express as px
-from utils.helpers import apply_custom_css
+from utils.charts import plot_cached
+from utils.helpers import apply_custom_css, create_export_button, live_refresh_controls, show_flash
 import config
+from database.live import live_ttl, refresh_interval
+from database.kpi_queries import FAILURE_CODES, failure_rows_query, fetch_failure_rows, fetch_news_kpis
 from utils.init_db import get_manager
 from utils.auth import require_login, sidebar_logout
 
@@ -13,109 +16,117 @@ authenticator = require_login()
 sidebar_logout(authenticator)
 
 apply_custom_css()
+live_refresh_controls("dashboard_db")
 
 db = get_manager("dashboard_db")
 
 st.markdown('<p class="main-header">News Source Status</p>', unsafe_allow_html=True)
 
-# Data Loading from PostgreSQL
-df = db.fetch_data(f"SELECT * FROM {config.DASHBOARD_TABLE}")
-
-if df.empty:
-    st.warning("No data found in the PostgreSQL table.")
-else:
-    # KPI CARDS
-    st.subheader("Overview")
-    col1, col2, col3, col4= st.columns(4)
-
-    with col1:
-        # Total News Source
-        total_sources = df['portal_url'].shape[0]
-        st.metric("Total News Source", f"{total_sources}")
-
-    with col2:
-        # Total Status Success
-        total_success = df[df['status'] == 'SUCCESS'].shape[0]
-        st.metric("Total Success", f"{total_success}")
-
-    with col3:
-        # Total Status Failed
-        total_failed = df[df['status'] == 'FAILED'].shape[0]
-        st.metric("Total Failed", f"{total_failed}")
-
-    with col4:
-        # Latest Updated
-        if 'updated_at' in df.columns:
-            df['updated_at'] = pd.to_datetime(df['updated_at'])
-            latest_date = df['updated_at'].max()
-        else:
-            latest_date = None
 
-        if pd.notna(latest_date):
-            display_date = latest_date.strftime("%d/%m/%y %H:%M")
+def failures_figure(failure_by_cat):
+    # Create the Bar Chart
+    fig = px.bar(
+        failure_by_cat, 
+        x='failure_code', 
+        y='total_failures',
+        color='failure_code',
+        title="Failures by Code",
+        labels={'scope': 'Category', 'total_failures': 'Total Failures'},
+        text_auto=True
+    )
+
+    fig.update_layout(
+        xaxis_title="Failure Code",
+        yaxis_title="Count of Failures",
+        showlegend=False,
+        template="plotly_white",
+        height=500
+    )
+    return fig
+
+
+# In live mode this panel re-runs on its own interval, without the login / CSS above
+@st.fragment(run_every=refresh_interval("news"))
+def news_panels():
+    # KPI Loading from PostgreSQL (aggregated server-side, one small row set).
+    # Failure rows are loaded incrementally (only changed rows) when the preview is open.
+    kpis = fetch_news_kpis(db, config.DASHBOARD_TABLE, FAILURE_CODES, ttl=live_ttl("dashboard_db"))
+
+    if kpis["total_sources"] == 0:
+        st.warning("No data found in the PostgreSQL table.")
+    else:
+        # KPI CARDS
+        st.subheader("Overview")
+        col1, col2, col3, col4= st.columns(4)
+
+        with col1:
+            # Total News Source
+            st.metric("Total News Source", f"{kpis['total_sources']}")
+
+        with col2:
+            # Total Status Success
+            st.metric("Total Success", f"{kpis['total_success']}")
+
+        with col3:
+            # Total Status Failed
+            st.metric("Total Failed", f"{kpis['total_failed']}")
+
+        with col4:
+            # Latest Updated
+            latest_date = kpis["latest_updated"]
+
+            if pd.notna(latest_date):
+                display_date = latest_date.strftime("%d/%m/%y %H:%M")
+            else:
+                display_date = "N/A"
+            st.metric("Last Updated", display_date)
+
+        st.markdown("---")
+
+        # FAILED SCRAPER BAR GRAPH
+        st.subheader("Failures by Code")
+
+        failure_by_cat = kpis["failures_by_code"]
+
+        if not failure_by_cat.empty:
+            plot_cached(failures_figure, failure_by_cat)
+
+            # Breakdown table for the specific types of failures
+            with st.expander("🔍 Detailed Failure Breakdown"):
+                breakdown = failure_by_cat.rename(columns={'total_failures': 'count'})
+                st.dataframe(breakdown, width='stretch', hide_index=True)
+
+            with st.expander("📋 Data Preview"):
+                # Row-level data is only fetched once the user asks for it
+                if st.toggle("Load failed sources", key="load_failure_preview"):
+                    filtered_df = fetch_failure_rows(db, config.DASHBOARD_TABLE, FAILURE_CODES)
+
+                    st.data_editor(
+                        filtered_df,
+                        column_config={
+                            "article_errors": st.column_config.JsonColumn(
+                                "Error Details",
+                                help="Detailed error logs in JSON format",
+                            ),
+                            "portal_url": st.column_config.LinkColumn(
+                                "Source URL"
+                                # display_text="Open Link"
+                            ),
+                        },
+                        hide_index=True,
+                        width='stretch'
+                    )
+
+                    export_sql, export_params = failure_rows_query(config.DASHBOARD_TABLE, FAILURE_CODES)
+                    create_export_button(
+                        db, export_sql, "failed_sources", params=export_params, key="export_failed_sources"
+                    )
+                else:
+                    st.caption("Turn on to load the failed sources.")
+
         else:
-            display_date = "N/A"
-        st.metric("Last Updated", display_date)
-
-    st.markdown("---")
-
-    # FAILED SCRAPER BAR GRAPH
-    st.subheader("Failures by Code")
-
-    # Define the failure code based on your requirements
-    failure_types = ['NO_PORTAL', 'NO_ARTICLE', 'BAD_SEL']
-    
-    # Filter only for failed records
-    failed_df = df[df['failure_code'].isin(failure_types)].copy()
-
-    if not failed_df.empty:
-        failure_by_cat = failed_df.groupby('failure_code').size().reset_index(name='total_failures')
-        
-        # Create the Bar Chart
-        fig = px.bar(
-            failure_by_cat, 
-            x='failure_code', 
-            y='total_failures',
-            color='failure_code',
-            title="Failures by Code",
-            labels={'scope': 'Category', 'total_failures': 'Total Failures'},
-            text_auto=True
-        )
-
-        fig.update_layout(
-            xaxis_title="Failure Code",
-            yaxis_title="Count of Failures",
-            showlegend=False,
-            template="plotly_white",
-            height=500
-        )
-        
-        st.plotly_chart(fig, width='stretch')
-        
-        # Breakdown table for the specific types of failures
-        with st.expander("🔍 Detailed Failure Breakdown"):
-            breakdown = failed_df.groupby(['failure_code']).size().reset_index(name='count')
-            st.dataframe(breakdown, width='stretch', hide_index=True)
-            
-        with st.expander("📋 Data Preview"):
-            failure_types = ['NO_PORTAL', 'NO_ARTICLE', 'BAD_SEL']
-            filtered_df = df[df['failure_code'].isin(failure_types)]
-
-            st.data_editor(
-                filtered_df,
-                column_config={
-                    "article_errors": st.column_config.JsonColumn(
-                        "Error Details",
-                        help="Detailed error logs in JSON format",
-                    ),
-                    "portal_url": st.column_config.LinkColumn(
-                        "Source URL"
-                        # display_text="Open Link"
-                    ),
-                },
-                hide_index=True,
-                width='stretch'
-            )
+            st.success("✅ No failures detected. All scrapers are returning 'Success'.")
 
-    else:
-        st.success("✅ No failures detected. All scrapers are returning 'Success'.")
\ No newline at end of file
+
+news_panels()
+show_flash()  # e.g. the welcome queued by Login.py
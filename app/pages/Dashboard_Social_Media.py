@@ -1,10 +1,17 @@
 import streamlit as st
+import numpy as np
 import pandas as pd
 import plotly.graph_objects as go
 import plotly.express as px
 from datetime import datetime, timedelta
-from utils.helpers import apply_custom_css
-import config
+from utils.charts import plot_cached, time_axis
+from utils.helpers import apply_custom_css, create_export_button, live_refresh_controls
+from database.health import check_health
+from database.live import live_ttl, refresh_interval
+from database.rollup import (
+    REFRESH_CONNECTION, ROLLUP_TABLE, platform_status_query, platform_totals_query, refresh_if_due
+)
+from database.trends import TREND_WINDOWS, trend_matrix, trend_window
 from utils.init_db import get_manager
 from utils.auth import require_login, sidebar_logout
 
@@ -15,6 +22,7 @@ authenticator = require_login()
 sidebar_logout(authenticator)
 
 apply_custom_css()
+live_refresh_controls("dashboard_db")
 
 st.markdown('<p class="main-header">Social Media Scraper Monitoring</p>', unsafe_allow_html=True)
 
@@ -29,59 +37,147 @@ PLATFORMS = {
     "YouTube": {"emoji": "▶️", "api": "YOUTUBE API", "color": "#FF0000"}
 }
 
-# Get date range (last 30 days)
-end_date = datetime.now()
-start_date = end_date - timedelta(days=30)
-
-# Query data from the unified social media monitoring table
-query = f"""
-    SELECT 
-        platform,
-        mention_date,
-        mention_datetime,
-        SUM(scraped_count) as total_scraped,
-        SUM(filtered_count) as total_filtered,
-        keywords,
-        filter_criteria,
-        MAX(last_updated) as last_updated,
-        COUNT(CASE WHEN scraping_status = 'SUCCESS' THEN 1 END) as success_count
-    FROM {config.SOCIAL_MEDIA_MONITORING_TABLE}
-    WHERE mention_datetime BETWEEN '{start_date}' AND '{end_date}'
-    GROUP BY platform, mention_date, mention_datetime, keywords, filter_criteria
-    ORDER BY mention_datetime DESC
-"""
-
-# Try to fetch data, otherwise use sample data for demonstration
-try:
-    df = db.fetch_data(query)
-    if df.empty:
-        st.warning("No monitoring data found for the past 30 days. Showing sample data.")
+def report_range():
+    """Last 30 days, recomputed on every panel run so a wall monitor keeps moving."""
+    end_date = datetime.now()
+    return end_date - timedelta(days=30), end_date
+
+
+def keep_rollup_current():
+    # Keep the daily rollup current (incremental, throttled across all sessions)
+    refresh_result = refresh_if_due(get_manager(REFRESH_CONNECTION))
+    if refresh_result is not None and not refresh_result[0]:
+        st.warning(f"Rollup refresh failed, showing the last refreshed data. {refresh_result[1]}")
+
+
+keep_rollup_current()
+
+
+def load_platform_data():
+    """Per-platform 30-day totals; sample data when the rollup has nothing."""
+    start_date, end_date = report_range()
+    # Try to fetch data, otherwise use sample data for demonstration
+    try:
+        df = db.fetch_data(*platform_totals_query(start_date.date(), end_date.date()), ttl=live_ttl("dashboard_db"))
+        if df.empty:
+            st.warning("No monitoring data found for the past 30 days. Showing sample data.")
+            use_sample_data = True
+        else:
+            use_sample_data = False
+    except Exception as e:
+        st.warning(f"Could not connect to database: {str(e)}. Showing sample data for demonstration.")
         use_sample_data = True
+
+    # If using sample data, create it for demonstration
+    if use_sample_data:
+        platform_data = pd.DataFrame({
+            "Platform": list(PLATFORMS.keys()),
+            "Total Scraped": [12500, 9800, 8300, 7200, 7400],
+            "Filtered & Stored": [5200, 3800, 4100, 2900, 2800],
+        })
     else:
-        use_sample_data = False
-except Exception as e:
-    st.warning(f"Could not connect to database: {str(e)}. Showing sample data for demonstration.")
-    use_sample_data = True
-
-# If using sample data, create it for demonstration
-if use_sample_data:
-    platform_data = pd.DataFrame({
-        "Platform": list(PLATFORMS.keys()),
-        "Total Scraped": [12500, 9800, 8300, 7200, 7400],
-        "Filtered & Stored": [5200, 3800, 4100, 2900, 2800],
-    })
-else:
-    # Aggregate data by platform from query results
-    platform_data = df.groupby('platform').agg({
-        'total_scraped': 'sum',
-        'total_filtered': 'sum'
-    }).reset_index()
-    platform_data.columns = ['Platform', 'Total Scraped', 'Filtered & Stored']
-
-# Create tabs for different views
-tab1, tab2, tab3 = st.tabs(["📊 Overview", "📈 Trends", "⚙️ Credits & Status"])
-
-with tab1:
+        # Already aggregated by platform in the rollup query
+        platform_data = df[['platform', 'total_scraped', 'total_filtered']].copy()
+        platform_data.columns = ['Platform', 'Total Scraped', 'Filtered & Stored']
+    return platform_data, use_sample_data
+
+
+# Figure builders: pure functions of their input frame, so plot_cached can reuse
+# the built figure until the data changes (utils/charts.py)
+def platform_bar_figure(platform_data):
+    fig_bar = px.bar(
+        platform_data,
+        x="Platform",
+        y="Total Scraped",
+        color="Platform",
+        title="Total Content Scraped by Platform",
+        text_auto=True,
+        color_discrete_map={p: PLATFORMS[p]["color"] for p in PLATFORMS.keys()}
+    )
+    fig_bar.update_layout(showlegend=False, height=400)
+    return fig_bar
+
+
+def platform_pie_figure(platform_data):
+    fig_pie = go.Figure(data=[go.Pie(
+        labels=platform_data["Platform"],
+        values=platform_data["Total Scraped"].to_numpy(),
+        marker=dict(colors=[PLATFORMS[p]["color"] for p in platform_data["Platform"]])
+    )])
+    fig_pie.update_layout(title="Distribution of Scraped Content", height=400)
+    return fig_pie
+
+
+def filtered_comparison_figure(platform_data):
+    fig_comparison = px.bar(
+        platform_data,
+        x="Platform",
+        y=["Total Scraped", "Filtered & Stored"],
+        barmode="group",
+        title="Scraped vs Filtered Content",
+        text_auto=True,
+        labels={"value": "Count", "variable": "Content Type"}
+    )
+    fig_comparison.update_layout(height=400)
+    return fig_comparison
+
+
+def trend_figure(trend_data, period):
+    dates = time_axis(trend_data["Date"])
+    fig_trend = go.Figure()
+    for platform in PLATFORMS.keys():
+        if platform in trend_data.columns:
+            fig_trend.add_trace(go.Scatter(
+                x=dates,
+                y=trend_data[platform].to_numpy(dtype="float64"),
+                mode='lines+markers',
+                name=platform,
+                line=dict(color=PLATFORMS[platform]["color"], width=3)
+            ))
+    
+    fig_trend.update_layout(
+        title=f"Content Scraped ({period})",
+        xaxis_title="Date",
+        xaxis_type="date",
+        yaxis_title="Content Count",
+        hovermode='x unified',
+        height=450
+    )
+    return fig_trend
+
+
+def cumulative_figure(running_data, period):
+    dates = time_axis(running_data["Date"])
+    platforms = [p for p in PLATFORMS.keys() if p in running_data.columns]
+    
+    fig_cumulative = go.Figure()
+    for idx, platform in enumerate(platforms):
+        fig_cumulative.add_trace(go.Scatter(
+            x=dates,
+            y=running_data[platform].to_numpy(dtype="float64"),
+            mode='lines',
+            name=platform,
+            fill='tonexty' if idx > 0 else None,
+            line=dict(color=PLATFORMS[platform]["color"], width=2)
+        ))
+    
+    fig_cumulative.update_layout(
+        title=f"Cumulative Content Scraped ({period})",
+        xaxis_title="Date",
+        xaxis_type="date",
+        yaxis_title="Cumulative Count",
+        hovermode='x unified',
+        height=450
+    )
+    return fig_cumulative
+
+
+# Each panel is a fragment: in live mode it re-runs on its own interval (database/live.py)
+@st.fragment(run_every=refresh_interval("social_overview"))
+def overview_panel():
+    start_date, end_date = report_range()
+    platform_data = load_platform_data()[0]
+
     st.subheader("1-Month Scraping Overview")
     
     # Create 5 columns for platform cards
@@ -127,131 +223,127 @@ with tab1:
     col_chart1, col_chart2 = st.columns(2)
     
     with col_chart1:
-        fig_bar = px.bar(
-            platform_data,
-            x="Platform",
-            y="Total Scraped",
-            color="Platform",
-            title="Total Content Scraped by Platform",
-            text_auto=True,
-            color_discrete_map={p: PLATFORMS[p]["color"] for p in PLATFORMS.keys()}
-        )
-        fig_bar.update_layout(showlegend=False, height=400)
-        st.plotly_chart(fig_bar, use_container_width=True)
+        plot_cached(platform_bar_figure, platform_data)
     
     with col_chart2:
-        fig_pie = go.Figure(data=[go.Pie(
-            labels=platform_data["Platform"],
-            values=platform_data["Total Scraped"],
-            marker=dict(colors=[PLATFORMS[p]["color"] for p in platform_data["Platform"]])
-        )])
-        fig_pie.update_layout(title="Distribution of Scraped Content", height=400)
-        st.plotly_chart(fig_pie, use_container_width=True)
+        plot_cached(platform_pie_figure, platform_data)
     
     st.markdown("---")
     
     # Filtered vs Total Content
     st.subheader("Filtered Content Analysis")
     
-    fig_comparison = px.bar(
-        platform_data,
-        x="Platform",
-        y=["Total Scraped", "Filtered & Stored"],
-        barmode="group",
-        title="Scraped vs Filtered Content",
-        text_auto=True,
-        labels={"value": "Count", "variable": "Content Type"}
-    )
-    fig_comparison.update_layout(height=400)
-    st.plotly_chart(fig_comparison, use_container_width=True)
+    plot_cached(filtered_comparison_figure, platform_data)
     
     with st.expander("🔍 Detailed Platform Statistics"):
         st.dataframe(platform_data, use_container_width=True, hide_index=True)
 
-with tab2:
-    st.subheader("30-Day Trend Analysis")
+        # Daily per-platform rows behind these totals
+        create_export_button(
+            db,
+            f"SELECT * FROM {ROLLUP_TABLE} WHERE mention_date BETWEEN :start_date AND :end_date "
+            "ORDER BY mention_date, platform",
+            table_name="social_media_daily",
+            params={"start_date": start_date.date(), "end_date": end_date.date()},
+            key="export_social_daily"
+        )
+
+
+@st.fragment(run_every=refresh_interval("social_trends"))
+def trends_panel():
+    col_window, col_resolution = st.columns([3, 1])
+    with col_window:
+        days = st.select_slider(
+            "Window (days)", options=TREND_WINDOWS, value=30, key="trend_days"
+        )
+    with col_resolution:
+        hourly = st.toggle("Hourly", key="trend_hourly", help="Hourly buckets from mention_datetime")
+    resolution = "hour" if hourly else "day"
+    period = f"{days}-Day {'Hourly' if hourly else 'Daily'} Trend"
+
+    # Dense matrix over the whole window (days without data are zeros), see database/trends.py
+    trend_data, running_data = trend_matrix(
+        db, days, resolution, platforms=list(PLATFORMS), ttl=live_ttl("dashboard_db")
+    )
+
+    st.subheader(f"{days}-Day Trend Analysis")
     
-    if use_sample_data:
-        # Generate sample daily data for demonstration
-        dates = pd.date_range(end=datetime.now(), periods=30, freq='D')
+    if trend_data.empty:
+        # Generate sample data for demonstration
+        dates = trend_window(days, resolution)
+        steps = np.arange(len(dates))
         trend_data = pd.DataFrame({
             "Date": dates,
-            "Facebook": [400 + i*15 for i in range(30)],
-            "Twitter": [300 + i*10 for i in range(30)],
-            "Instagram": [280 + i*12 for i in range(30)],
-            "TikTok": [240 + i*8 for i in range(30)],
-            "YouTube": [250 + i*9 for i in range(30)],
+            "Facebook": 400 + steps*15,
+            "Twitter": 300 + steps*10,
+            "Instagram": 280 + steps*12,
+            "TikTok": 240 + steps*8,
+            "YouTube": 250 + steps*9,
         })
-    else:
-        # Create trend data from actual database
-        trend_query = f"""
-            SELECT mention_date as Date, platform, SUM(scraped_count) as count
-            FROM {config.SOCIAL_MEDIA_MONITORING_TABLE}
-            WHERE mention_datetime BETWEEN '{start_date}' AND '{end_date}'
-            GROUP BY mention_date, platform
-            ORDER BY mention_date, platform
-        """
-        try:
-            trend_df = db.fetch_data(trend_query)
-            # Pivot the data for visualization
-            trend_data = trend_df.pivot(index='Date', columns='platform', values='count').reset_index()
-            trend_data = trend_data.fillna(0)
-        except Exception as e:
-            st.error(f"Error fetching trend data: {str(e)}")
-            trend_data = None
-    
-    if trend_data is not None:
-        # Line chart for trends
-        fig_trend = go.Figure()
-        for platform in PLATFORMS.keys():
-            if platform in trend_data.columns:
-                fig_trend.add_trace(go.Scatter(
-                    x=trend_data["Date"],
-                    y=trend_data[platform],
-                    mode='lines+markers',
-                    name=platform,
-                    line=dict(color=PLATFORMS[platform]["color"], width=3)
-                ))
-        
-        fig_trend.update_layout(
-            title="Daily Content Scraped (30-Day Trend)",
-            xaxis_title="Date",
-            yaxis_title="Content Count",
-            hovermode='x unified',
-            height=450
-        )
-        st.plotly_chart(fig_trend, use_container_width=True)
-        
-        # Cumulative chart
-        st.subheader("Cumulative Content Scraped")
-        
-        cumulative_data = trend_data.copy()
-        for platform in PLATFORMS.keys():
-            if platform in cumulative_data.columns:
-                cumulative_data[platform] = cumulative_data[platform].cumsum()
-        
-        fig_cumulative = go.Figure()
-        for idx, platform in enumerate(PLATFORMS.keys()):
-            if platform in cumulative_data.columns:
-                fig_cumulative.add_trace(go.Scatter(
-                    x=cumulative_data["Date"],
-                    y=cumulative_data[platform],
-                    mode='lines',
-                    name=platform,
-                    fill='tonexty' if idx > 0 else None,
-                    line=dict(color=PLATFORMS[platform]["color"], width=2)
-                ))
-        
-        fig_cumulative.update_layout(
-            title="Cumulative Content Scraped (30-Day Period)",
-            xaxis_title="Date",
-            yaxis_title="Cumulative Count",
-            hovermode='x unified',
-            height=450
-        )
-        st.plotly_chart(fig_cumulative, use_container_width=True)
+        running_data = trend_data.copy()
+        running_data[list(PLATFORMS)] = trend_data[list(PLATFORMS)].cumsum(axis=0)
+    
+    # Line chart for trends
+    plot_cached(trend_figure, trend_data, period)
+    
+    # Cumulative chart
+    st.subheader("Cumulative Content Scraped")
+    plot_cached(cumulative_figure, running_data, period)
+
+
+@st.fragment(run_every=refresh_interval("social_status"))
+def status_panel():
+    st.subheader("Last Updated Information")
+    
+    # Last updated status from the daily rollup
+    try:
+        status_df = db.fetch_data(*platform_status_query(days=7), ttl=live_ttl("dashboard_db"))
+        if not status_df.empty:
+            status_data = status_df
+        else:
+            status_data = pd.DataFrame({
+                "Platform": list(PLATFORMS.keys()),
+                "last_updated": [datetime.now()] * 5,
+                "Status": ["Active ✅"] * 5
+            })
+    except Exception as e:
+        status_data = pd.DataFrame({
+            "Platform": list(PLATFORMS.keys()),
+            "last_updated": [datetime.now()] * 5,
+            "Status": ["Active ✅"] * 5
+        })
+    
+    st.dataframe(status_data, use_container_width=True, hide_index=True)
+    
+    st.markdown("---")
+    
+    st.subheader("System Status")
+    col_status1, col_status2, col_status3 = st.columns(3)
+    
+    with col_status1:
+        st.markdown("### 🔋 Database Connection")
+        # SELECT 1 + pool stats, cached for a few seconds across all sessions
+        health = check_health("dashboard_db")
+        if health["connected"]:
+            st.success(f"Connected ({health['latency_ms']:.0f} ms)")
+            latency = health["latency_percentiles_ms"]
+            st.caption(
+                f"p50 {latency['p50']:.0f} ms · p95 {latency['p95']:.0f} ms · "
+                f"pool: {health['pool'].get('checkedout', '?')} in use / {health['pool'].get('size', '?')}"
+            )
+        else:
+            st.error("Disconnected")
+    
+    with col_status2:
+        st.markdown("### 🌐 API Connectivity")
+        st.success("All APIs Online")
+    
+    with col_status3:
+        st.markdown("### ⚠️ Alerts")
+        st.warning("Check API credits regularly")
+
 
-with tab3:
+def credits_panel():
     st.subheader("Scraper Credits & Limits")
     st.info("ℹ️ API credits and limits are fetched directly from each platform's API. Refresh to get the latest information.")
     
@@ -298,55 +390,16 @@ with tab3:
         st.dataframe(scraper_credits, use_container_width=True, hide_index=True)
     
     st.markdown("---")
-    
-    st.subheader("Last Updated Information")
-    
-    # Query last updated status from logs
-    status_query = f"""
-        SELECT DISTINCT platform, MAX(last_updated) as last_updated, MAX(scraping_status) as status
-        FROM {config.SOCIAL_MEDIA_MONITORING_TABLE}
-        WHERE mention_datetime >= NOW() - INTERVAL '7 days'
-        GROUP BY platform
-        ORDER BY last_updated DESC
-    """
-    
-    try:
-        status_df = db.fetch_data(status_query)
-        if not status_df.empty:
-            status_data = status_df
-        else:
-            status_data = pd.DataFrame({
-                "Platform": list(PLATFORMS.keys()),
-                "last_updated": [datetime.now()] * 5,
-                "Status": ["Active ✅"] * 5
-            })
-    except Exception as e:
-        status_data = pd.DataFrame({
-            "Platform": list(PLATFORMS.keys()),
-            "last_updated": [datetime.now()] * 5,
-            "Status": ["Active ✅"] * 5
-        })
-    
-    st.dataframe(status_data, use_container_width=True, hide_index=True)
-    
-    st.markdown("---")
-    
-    st.subheader("System Status")
-    col_status1, col_status2, col_status3 = st.columns(3)
-    
-    with col_status1:
-        st.markdown("### 🔋 Database Connection")
-        try:
-            test_query = f"SELECT COUNT(*) FROM {config.SOCIAL_MEDIA_MONITORING_TABLE}"
-            db.fetch_data(test_query)
-            st.success("Connected")
-        except:
-            st.error("Disconnected")
-    
-    with col_status2:
-        st.markdown("### 🌐 API Connectivity")
-        st.success("All APIs Online")
-    
-    with col_status3:
-        st.markdown("### ⚠️ Alerts")
-        st.warning("Check API credits regularly")
\ No newline at end of file
+
+    status_panel()
+
+
+# One view at a time: unlike st.tabs, only the selected panel runs its query and builds
+# its figures. Its data stays in the query cache, so switching back does not re-query.
+VIEWS = {
+    "📊 Overview": overview_panel,
+    "📈 Trends": trends_panel,
+    "⚙️ Credits & Status": credits_panel,
+}
+selected_view = st.radio("View", list(VIEWS), key="social_view", horizontal=True, label_visibility="collapsed")
+VIEWS[selected_view]()
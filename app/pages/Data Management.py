@@ -1,9 +1,14 @@
+import time
 import streamlit as st
 import pandas as pd
 import config
+from database.schema_cache import get_schema_cache, get_table_schema, primary_key_columns, split_table_name
+from database.bulk_load import load_frame, read_upload, validate_frame
+from database.grid_edit import READ_ONLY_COLUMNS, diff_editor_state, patch_frame
+from database.search import SEARCH_MODES, build_search_filter
+from utils.helpers import create_export_button, flash, show_flash
 from utils.init_db import get_manager
 from utils.auth import require_login, sidebar_logout
-import time
 from datetime import datetime
 
 # Page Configuration
@@ -39,16 +44,78 @@ selected_table = config.MANAGEMENT_TABLES[selected_label]
 
 st.markdown("---")
 
-# 2. LOAD DATA DYNAMICALLY
+# Table structure from the shared schema cache (drives search and the Add / Edit forms)
+schema_name, table_name = split_table_name(selected_table)
+schema_df = get_table_schema(db, selected_table)
+has_id = not schema_df.empty and 'id' in schema_df['column_name'].values
+
+# 2. LOAD ONE PAGE (keyset pagination on 'id', LIMIT/OFFSET for tables without one)
+PAGE_SIZES = [50, 100, 250, 500]
+SEARCH_MATCH_LIMIT = 50
+default_page_size = getattr(config, "MANAGEMENT_PAGE_SIZE", 100)
+
+# One cursor per visited page: the last id of the previous page (None = first page)
+cursor_key = f"page_cursors_{selected_table}"
+if cursor_key not in st.session_state:
+    st.session_state[cursor_key] = [None]
+cursors = st.session_state[cursor_key]
+
+def reset_pagination():
+    st.session_state[cursor_key] = [None]
+
+page_size = st.session_state.get("page_size", default_page_size)
+
+# Rows patched in place by a grid save are reused for this page instead of re-reading it,
+# until the user moves to another page or a cached read of the table would have expired
+page_signature = (selected_table, tuple(cursors), page_size)
+grid_rows = st.session_state.get("grid_rows")
+if grid_rows and (
+    grid_rows["page"] != page_signature
+    or time.monotonic() - grid_rows["saved_at"] > db.table_ttl(selected_table)
+):
+    st.session_state.pop("grid_rows", None)
+    grid_rows = None
+
 try:
     # Uses the underlying DB name (e.g., 'from_news.news_source_new')
-    df = db.fetch_data(f"SELECT * FROM {selected_table}")
+    if grid_rows and grid_rows["page"] == page_signature:
+        df = grid_rows["rows"]
+    elif has_id:
+        df = db.fetch_page(selected_table, page_size, after_id=cursors[-1])
+    else:
+        df = db.fetch_page(selected_table, page_size, key=None, offset=(len(cursors) - 1) * page_size)
 except Exception as e:
     st.error(f"Error loading table: {e}")
     df = pd.DataFrame()
 
+def next_page(last_id):
+    st.session_state[cursor_key].append(last_id)
+
+def prev_page():
+    if len(st.session_state[cursor_key]) > 1:
+        st.session_state[cursor_key].pop()
+
+estimated_rows = db.estimate_row_count(selected_table)
+
+# Pager (applies to the View, Edit and Delete tabs)
+pager_col1, pager_col2, pager_col3, pager_col4 = st.columns([3, 1, 1, 1])
+with pager_col1:
+    estimate_text = f"~{estimated_rows:,}" if estimated_rows is not None else "unknown"
+    st.caption(f"Page {len(cursors)} · {len(df)} rows on this page · {estimate_text} rows in table (estimate)")
+with pager_col2:
+    st.button("◀ Previous", on_click=prev_page, disabled=len(cursors) <= 1, width='stretch')
+with pager_col3:
+    last_id = int(df['id'].max()) if has_id and not df.empty else None
+    st.button("Next ▶", on_click=next_page, args=(last_id,), disabled=len(df) < page_size, width='stretch')
+with pager_col4:
+    st.selectbox(
+        "Page size", PAGE_SIZES,
+        index=PAGE_SIZES.index(default_page_size) if default_page_size in PAGE_SIZES else 1,
+        key="page_size", on_change=reset_pagination, label_visibility="collapsed"
+    )
+
 # Tabs
-tab1, tab2, tab3, tab4 = st.tabs(["👀 View", "➕ Add", "✏️ Edit", "🗑️ Delete"])
+tab1, tab2, tab3, tab4, tab5 = st.tabs(["👀 View", "➕ Add", "✏️ Edit", "🗑️ Delete", "📤 Bulk Upload"])
 
 # TAB 1: VIEW RECORDS
 with tab1:
@@ -58,56 +125,58 @@ with tab1:
         st.warning("No data available or table is empty.")
     else:
         # Search and Filter Layout
-        col1, col2 = st.columns([2, 1])
+        col1, col2, col3 = st.columns([2, 1, 1])
         with col1:
-            search_col = st.selectbox("Search in column", ["All"] + df.columns.tolist())
+            search_col = st.selectbox("Search in column", ["All"] + schema_df['column_name'].tolist())
         with col2:
             search_term = st.text_input("Search term", "")
+        with col3:
+            search_mode = st.radio("Match", list(SEARCH_MODES.keys()), horizontal=True)
         
-        # Apply Logic
-        if search_term and search_col != "All":
-            filtered_df = df[df[search_col].astype(str).str.contains(search_term, case=False, na=False)]
-        elif search_term:
-            filtered_df = df[df.astype(str).apply(lambda x: x.str.contains(search_term, case=False, na=False)).any(axis=1)]
+        # Apply Logic (pushed down to SQL so it can use the trigram / full-text indexes)
+        if search_term:
+            where, where_params = build_search_filter(schema_df, search_col, search_term, SEARCH_MODES[search_mode])
+            filtered_df = db.fetch_page(
+                selected_table, page_size, key='id' if has_id else None, where=where, params=where_params
+            )
+            limit_note = " (first matches only, refine your search)" if len(filtered_df) >= page_size else ""
+            st.info(f"Showing {len(filtered_df)} matching records{limit_note}")
         else:
             filtered_df = df
-        
-        st.info(f"Showing {len(filtered_df)} of {len(df)} records")
+            st.info(f"Showing {len(filtered_df)} records on this page")
+
         st.dataframe(filtered_df, width='stretch', height=500, hide_index=True)
 
+        # Export streams the whole table (or every search match), not just this page
+        with st.expander("📦 Export"):
+            export_sql = f"SELECT * FROM {selected_table}"
+            export_params = None
+            if search_term:
+                export_sql += f" WHERE {where}"
+                export_params = where_params
+            if has_id:
+                export_sql += " ORDER BY id"
+            create_export_button(
+                db, export_sql, table_name, params=export_params,
+                key=f"export_{selected_table}", expected_rows=estimated_rows
+            )
+
 # --- TAB 2: ADD RECORD ---
 with tab2:
     st.subheader("➕ Add New Record")
     
-    # if "." in config.MANAGEMENT_TABLE:
-    #     schema_name, table_name = config.MANAGEMENT_TABLE.split(".", 1)
-    # else:
-    #     schema_name, table_name = 'public', config.MANAGEMENT_TABLE
-
-    # Update schema split
-    if "." in selected_table:
-        schema_name, table_name = selected_table.split(".", 1)
-    else:
-        schema_name, table_name = 'public', selected_table
-
-    schema_query = f"""
-        SELECT column_name, data_type 
-        FROM information_schema.columns 
-        WHERE table_schema = '{schema_name}' 
-        AND table_name = '{table_name}'
-    """
-    schema_df = db.fetch_data(schema_query)
     sample_df = df.head(1) if not df.empty else pd.DataFrame()
 
-    if "add_msg" in st.session_state:
-        st.success(st.session_state["add_msg"])
-        del st.session_state["add_msg"]
+    st.button(
+        "🔄 Reload table structure", key="reload_schema",
+        on_click=get_schema_cache().refresh, args=(db.connection_name,)
+    )
 
     if schema_df.empty:
-        st.error(f"❌ Could not find structure for table '{config.MANAGEMENT_TABLE}'.")
+        st.error(f"❌ Could not find structure for table '{selected_table}'.")
     else:
         # 1. HIDE the system columns from the UI
-        exclude_cols = ['id', 'created_at', 'last_updated_at']
+        exclude_cols = ['id', 'created_at', 'last_updated_at'] + primary_key_columns(schema_df)
         form_fields = schema_df[~schema_df['column_name'].str.lower().isin(exclude_cols)]
         
         with st.form("add_record_form", clear_on_submit=True):
@@ -156,9 +225,8 @@ with tab2:
                 success, message = db.execute_query(insert_query, new_record_data)
                 
                 if success:
-                    st.success("✅ Record added successfully!")
-                    st.session_state["add_msg"] = "✅ Record added successfully!"
-                    time.sleep(1.5)
+                    st.session_state.pop("grid_rows", None)
+                    flash("Record added successfully!")
                     st.rerun()
                 else:
                     st.error(message)
@@ -167,25 +235,55 @@ with tab2:
 with tab3:
     st.subheader("✏️ Edit Existing Record")
     
-    if df.empty or 'id' not in df.columns:
+    if df.empty or not has_id:
         st.warning("No records available to edit, or table lacks an 'id' column.")
     else:
+        grid_mode = st.toggle("▦ Grid edit (all rows on this page)", key="grid_mode")
+
+        if grid_mode:
+            editor_key = f"grid_editor_{st.session_state.get('grid_version', 0)}"
+
+            def save_grid(frame):
+                updates, inserts, deletes = diff_editor_state(frame, st.session_state.get(editor_key, {}))
+                if 'created_at' in frame.columns:
+                    for new_row in inserts:
+                        new_row['created_at'] = datetime.now()
+                success, message, rows = db.apply_row_changes(selected_table, updates, inserts, deletes)
+                if success:
+                    # Patch only the touched rows; the fresh editor key clears the pending edits
+                    st.session_state["grid_rows"] = {
+                        "page": page_signature, "rows": patch_frame(frame, rows, deletes), "saved_at": time.monotonic()
+                    }
+                    st.session_state["grid_version"] = st.session_state.get("grid_version", 0) + 1
+                flash(message.lstrip("✅❌ "), icon="✅" if success else "❌")
+
+            st.caption("Edit cells, add rows at the bottom or select rows and press Delete, then save everything at once.")
+            st.data_editor(
+                df, key=editor_key, num_rows="dynamic", hide_index=True, width='stretch',
+                disabled=[c for c in READ_ONLY_COLUMNS if c in df.columns]
+            )
+            st.button("💾 Save All Changes", type="primary", on_click=save_grid, args=(df,), use_container_width=True)
+
         # Simple text input for the search term
-        search_term_edit = st.text_input("Enter Record ID or exact search term to edit:", key="text_search_edit")
+        search_term_edit = "" if grid_mode else st.text_input(
+            "Enter Record ID or exact search term to edit:", key="text_search_edit"
+        )
         
         if search_term_edit:
             # 1. Try to find the record by exact ID first
             if search_term_edit.isdigit():
-                filtered_df = df[df['id'] == int(search_term_edit)]
-            # 2. Otherwise, search across all columns
+                filtered_df = db.fetch_data(f"SELECT * FROM {selected_table} WHERE id = :id", {"id": int(search_term_edit)}, compact=False)
+            # 2. Otherwise, search across all columns (in SQL)
             else:
-                filtered_df = df[df.astype(str).apply(lambda x: x.str.contains(search_term_edit, case=False, na=False)).any(axis=1)]
+                where, where_params = build_search_filter(schema_df, "All", search_term_edit)
+                filtered_df = db.fetch_page(selected_table, SEARCH_MATCH_LIMIT, where=where, params=where_params)
             
             # Handle the results
             if filtered_df.empty:
                 st.error("❌ No matching records found.")
             elif len(filtered_df) > 1:
-                st.warning(f"⚠️ Found {len(filtered_df)} records. Please type the exact ID to edit.")
+                match_count = f"{len(filtered_df)}+" if len(filtered_df) >= SEARCH_MATCH_LIMIT else len(filtered_df)
+                st.warning(f"⚠️ Found {match_count} records. Please type the exact ID to edit.")
             else:
                 # Exactly 1 record found! Load the form.
                 current_record = filtered_df.iloc[0]
@@ -193,13 +291,8 @@ with tab3:
                 
                 st.success(f"Editing Record ID: {record_id}")
                 
-                # Fetch schema safely
-                # schema_name, table_name = config.MANAGEMENT_TABLE.split(".", 1) if "." in config.MANAGEMENT_TABLE else ('public', config.MANAGEMENT_TABLE)
-                # schema_df = db.fetch_data(f"SELECT column_name, data_type FROM information_schema.columns WHERE table_schema = '{schema_name}' AND table_name = '{table_name}'")
-                # Update schema split
-                schema_name, table_name = selected_table.split(".", 1) if "." in selected_table else ('public', selected_table)
-                schema_df = db.fetch_data(f"SELECT column_name, data_type FROM information_schema.columns WHERE table_schema = '{schema_name}' AND table_name = '{table_name}'")
-                exclude_cols = ['id', 'created_at', 'last_updated_at']
+                # Table structure comes from the schema cache loaded above
+                exclude_cols = ['id', 'created_at', 'last_updated_at'] + primary_key_columns(schema_df)
                 form_fields = schema_df[~schema_df['column_name'].str.lower().isin(exclude_cols)]
                 
                 with st.form("edit_record_form"):
@@ -248,9 +341,8 @@ with tab3:
                         
                         success, message = db.execute_query(update_query, update_data)
                         if success:
-                            st.success(f"✅ Record updated successfully!")
-                            
-                            time.sleep(1.5)
+                            st.session_state.pop("grid_rows", None)
+                            flash("Record updated successfully!")
                             
                             if "text_search_edit" in st.session_state:
                                 del st.session_state["text_search_edit"]
@@ -263,7 +355,7 @@ with tab3:
 with tab4:
     st.subheader("🗑️ Delete Record")
     
-    if df.empty or 'id' not in df.columns:
+    if df.empty or not has_id:
         st.warning("No records available to delete, or table lacks an 'id' column.")
     else:
         # Simple text input for the search term
@@ -272,16 +364,18 @@ with tab4:
         if search_term_del:
             # 1. Try to find the record by exact ID first
             if search_term_del.isdigit():
-                filtered_df = df[df['id'] == int(search_term_del)]
-            # 2. Otherwise, search across all columns
+                filtered_df = db.fetch_data(f"SELECT * FROM {selected_table} WHERE id = :id", {"id": int(search_term_del)}, compact=False)
+            # 2. Otherwise, search across all columns (in SQL)
             else:
-                filtered_df = df[df.astype(str).apply(lambda x: x.str.contains(search_term_del, case=False, na=False)).any(axis=1)]
+                where, where_params = build_search_filter(schema_df, "All", search_term_del)
+                filtered_df = db.fetch_page(selected_table, SEARCH_MATCH_LIMIT, where=where, params=where_params)
             
             # Handle the results
             if filtered_df.empty:
                 st.error("❌ No matching records found.")
             elif len(filtered_df) > 1:
-                st.warning(f"⚠️ Found {len(filtered_df)} records. Please type the exact ID to delete.")
+                match_count = f"{len(filtered_df)}+" if len(filtered_df) >= SEARCH_MATCH_LIMIT else len(filtered_df)
+                st.warning(f"⚠️ Found {match_count} records. Please type the exact ID to delete.")
             else:
                 # Exactly 1 record found! Show the delete warning.
                 current_record = filtered_df.iloc[0]
@@ -297,8 +391,8 @@ with tab4:
                     success, message = db.execute_query(delete_query, {"id": record_id})
                     
                     if success:
-                        st.success(f"✅ Record deleted successfully!")
-                        time.sleep(1.5)
+                        st.session_state.pop("grid_rows", None)
+                        flash("Record deleted successfully!")
                             
                         if "text_search_del" in st.session_state:
                             del st.session_state["text_search_del"]
@@ -306,4 +400,62 @@ with tab4:
                         st.rerun()
                     else:
                         st.error(message)
-            
\ No newline at end of file
+
+# --- TAB 5: BULK UPLOAD ---
+with tab5:
+    st.subheader("📤 Bulk Upload")
+    st.caption("Upload a CSV or Parquet file whose header matches the table columns. "
+               "Rows are checked against the table structure before anything is written.")
+
+    uploaded = st.file_uploader("File", type=["csv", "parquet"], key=f"bulk_file_{selected_table}")
+
+    if schema_df.empty:
+        st.error(f"❌ Could not find structure for table '{selected_table}'.")
+    elif uploaded is not None:
+        try:
+            upload_df = read_upload(uploaded)
+        except Exception as e:
+            st.error(f"❌ Could not read file: {e}")
+            upload_df = None
+
+        if upload_df is not None:
+            valid_df, errors_df, file_errors = validate_frame(upload_df, schema_df)
+
+            if file_errors:
+                for error in file_errors:
+                    st.error(f"❌ {error}")
+            else:
+                col1, col2, col3 = st.columns(3)
+                col1.metric("Rows in file", f"{len(upload_df):,}")
+                col2.metric("Valid rows", f"{len(valid_df):,}")
+                col3.metric("Rows with errors", f"{len(upload_df) - len(valid_df):,}")
+
+                if not errors_df.empty:
+                    with st.expander(f"⚠️ {len(errors_df):,} problems (rows with errors are skipped)"):
+                        st.dataframe(errors_df, width='stretch', hide_index=True)
+
+                pk_columns = primary_key_columns(schema_df)
+                can_upsert = bool(pk_columns) and set(pk_columns) <= set(valid_df.columns)
+                upsert = st.toggle(
+                    f"Update existing rows (match on {', '.join(pk_columns)})" if can_upsert
+                    else "Update existing rows (file has no primary key column)",
+                    value=can_upsert, disabled=not can_upsert, key="bulk_upsert"
+                )
+
+                if st.button(f"💾 Load {len(valid_df):,} rows", type="primary",
+                             disabled=valid_df.empty, use_container_width=True):
+                    with st.spinner("Loading..."):
+                        result = load_frame(db, selected_table, valid_df, schema_df, upsert=upsert)
+
+                    if result["ok"]:
+                        st.session_state.pop("grid_rows", None)
+                        flash(
+                            f"{result['message'].lstrip('✅ ')} in {result['seconds']:.2f} s "
+                            f"({result['rows_per_second']:,.0f} rows/s)"
+                        )
+                        st.rerun()
+                    else:
+                        st.error(result["message"])
+
+# Confirmations queued by the writes above (after the refreshed view, see utils/helpers.flash)
+show_flash()
@@ -0,0 +1,174 @@
+import streamlit as st
+import pandas as pd
+import config
+from database.metrics import get_metrics_registry
+from database.query_cache import get_query_cache
+from utils.helpers import apply_custom_css
+from utils.auth import require_login, sidebar_logout
+
+# Page Configuration
+st.set_page_config(page_title="Query Metrics", layout="wide")
+
+authenticator = require_login()
+sidebar_logout(authenticator)
+
+apply_custom_css()
+
+# Admin only: 'admin' role in config.yaml, or a username listed in config.ADMIN_USERS
+roles = st.session_state.get("roles") or []
+if "admin" not in roles and st.session_state.get("username") not in getattr(config, "ADMIN_USERS", []):
+    st.error("⛔ This page is only available to administrators.")
+    st.stop()
+
+st.markdown('<p class="main-header">Query Metrics</p>', unsafe_allow_html=True)
+
+registry = get_metrics_registry()
+cache_stats = get_query_cache().stats()
+snapshot = registry.snapshot()
+
+# SUMMARY
+col1, col2, col3, col4 = st.columns(4)
+total_calls = sum(h["count"] for h in snapshot["latency_ms"].values())
+total_hits = sum(snapshot["cache_hits"].values())
+
+with col1:
+    st.metric("Database Calls", f"{total_calls:,}")
+with col2:
+    hit_rate = total_hits / (total_hits + total_calls) * 100 if (total_hits + total_calls) else 0
+    st.metric("Cache Hit Rate", f"{hit_rate:.1f}%")
+with col3:
+    st.metric("Cached Results", f"{cache_stats['entries']:,}", f"{cache_stats['bytes'] / 1024 / 1024:.1f} MB")
+with col4:
+    st.metric("Slow Queries Logged", f"{len(snapshot['slow_queries']):,}", f">= {registry.slow_query_ms} ms")
+
+st.markdown("---")
+
+# TOP-N SLOWEST
+st.subheader("Slowest Queries")
+col_n, col_by = st.columns([1, 1])
+with col_n:
+    top_n = st.slider("Show top", 5, 50, 10)
+with col_by:
+    order_labels = {"Max time": "max_ms", "Total time": "total_ms", "Average time": "avg_ms", "Calls": "calls"}
+    order_by = st.selectbox("Order by", list(order_labels.keys()))
+
+top = pd.DataFrame(registry.top_queries(top_n, by=order_labels[order_by]))
+if top.empty:
+    st.info("No queries recorded yet.")
+else:
+    top["bytes"] = (top["bytes"] / 1024 / 1024).round(2)
+    top = top.rename(columns={"bytes": "MB"})
+    st.dataframe(
+        top[["query", "pages", "connection", "operation", "calls", "errors", "avg_ms", "max_ms", "total_ms", "rows", "MB"]],
+        column_config={
+            "avg_ms": st.column_config.NumberColumn("avg ms", format="%.1f"),
+            "max_ms": st.column_config.NumberColumn("max ms", format="%.1f"),
+            "total_ms": st.column_config.NumberColumn("total ms", format="%.0f"),
+        },
+        width='stretch',
+        hide_index=True
+    )
+
+# LATENCY BY PAGE
+st.subheader("Latency by Page")
+latency_rows = []
+for series, hist in snapshot["latency_ms"].items():
+    operation, page = series.split("|", 1)
+    latency_rows.append({
+        "page": page,
+        "operation": operation,
+        "calls": hist["count"],
+        "avg_ms": hist["sum"] / hist["count"] if hist["count"] else 0.0,
+        "cache_hits": snapshot["cache_hits"].get(page, 0),
+    })
+for connection, stats in snapshot["compaction"].items():
+    saved_mb = (stats["bytes_before"] - stats["bytes_after"]) / 1024 / 1024
+    ratio = stats["bytes_after"] / stats["bytes_before"] * 100 if stats["bytes_before"] else 100
+    st.caption(
+        f"Dtype compaction on **{connection}**: {saved_mb:.1f} MB saved over {stats['frames']:,} results "
+        f"(compacted size {ratio:.0f}% of original)"
+    )
+for connection, hist in snapshot["checkout_ms"].items():
+    st.caption(
+        f"Checkout wait on **{connection}**: avg {hist['sum'] / max(hist['count'], 1):.1f} ms over {hist['count']:,} checkouts"
+    )
+for connection, pool in snapshot["pools"].items():
+    if "checkedout" in pool:
+        st.caption(
+            f"Pool **{connection}**: {pool['checkedout']} in use / {pool['size']} "
+            f"(+{max(pool['overflow'], 0)} of {pool['max_overflow']} overflow), {pool['checkedin']} idle, "
+            f"checkout timeout {pool['timeout']:.0f} s"
+        )
+if latency_rows:
+    st.dataframe(pd.DataFrame(latency_rows).sort_values("avg_ms", ascending=False), width='stretch', hide_index=True)
+
+# SHARED DATASETS
+with st.expander("🗂️ Shared Datasets"):
+    st.caption(
+        f"{cache_stats['bytes'] / 1024 / 1024:.1f} of {cache_stats['max_bytes'] / 1024 / 1024:.0f} MB budget · "
+        f"{cache_stats['in_use_entries']:,} datasets in use by {cache_stats['shared_views']:,} session views "
+        f"({cache_stats['in_use_bytes'] / 1024 / 1024:.1f} MB)"
+    )
+    datasets = pd.DataFrame(get_query_cache().datasets(top_n))
+    if datasets.empty:
+        st.info("No datasets recorded yet.")
+    else:
+        datasets["bytes"] = (datasets["bytes"] / 1024 / 1024).round(2)
+        datasets["last_used"] = pd.to_datetime(datasets["last_used"], unit="s")
+        st.dataframe(
+            datasets.rename(columns={"bytes": "MB"})[
+                ["query", "params", "connection", "cached", "views", "hits", "misses", "MB", "last_used"]
+            ],
+            width='stretch',
+            hide_index=True
+        )
+
+# CHART PAYLOADS
+with st.expander("📊 Chart Payloads"):
+    chart_rows = []
+    for series, stats in snapshot["charts"].items():
+        chart, page = series.split("|", 1)
+        chart_rows.append({
+            "page": page,
+            "chart": chart,
+            "renders": stats["renders"],
+            "cached %": stats["cached"] / stats["renders"] * 100,
+            "last KB": stats["last_bytes"] / 1024,
+            "total MB": stats["bytes"] / 1024 / 1024,
+        })
+    if not chart_rows:
+        st.info("No charts rendered yet.")
+    else:
+        st.caption("Plotly JSON sent to the browser per render; cached renders skip building the figure.")
+        st.dataframe(
+            pd.DataFrame(chart_rows).sort_values("total MB", ascending=False),
+            column_config={
+                "cached %": st.column_config.NumberColumn(format="%.0f"),
+                "last KB": st.column_config.NumberColumn(format="%.1f"),
+                "total MB": st.column_config.NumberColumn(format="%.2f"),
+            },
+            width='stretch',
+            hide_index=True
+        )
+
+# SLOW QUERY LOG
+with st.expander("🐢 Slow Query Log"):
+    slow = pd.DataFrame(registry.slow_queries())
+    if slow.empty:
+        st.info("No slow queries recorded.")
+    else:
+        st.dataframe(slow, width='stretch', hide_index=True)
+
+# DUMPS
+st.markdown("---")
+col_prom, col_json = st.columns(2)
+with col_prom:
+    st.download_button(
+        "📥 Prometheus text", data=registry.to_prometheus(),
+        file_name="query_metrics.prom", mime="text/plain", width='stretch'
+    )
+with col_json:
+    st.download_button(
+        "📥 JSON", data=registry.to_json(),
+        file_name="query_metrics.json", mime="application/json", width='stretch'
+    )
@@ -0,0 +1,101 @@
+"""AsyncDatabaseManager must give the same results as DatabaseManager (reads, writes, caching)."""
+import pandas as pd
+import pytest
+from sqlalchemy.ext.asyncio import create_async_engine
+
+pytest.importorskip("asyncpg")
+
+from database import async_db_manager  # noqa: E402
+
+
+@pytest.fixture
+def adb(db, pg_engine, monkeypatch):
+    """An AsyncDatabaseManager on the test database (engines are created on the loop thread)."""
+    url = pg_engine.url.set(drivername="postgresql+asyncpg")
+    engines = {}
+
+    def get_async_engine(connection_name):
+        if connection_name not in engines:
+            engines[connection_name] = create_async_engine(url)
+        return engines[connection_name]
+
+    monkeypatch.setattr(async_db_manager, "_get_async_engine", get_async_engine)
+    manager = async_db_manager.AsyncDatabaseManager("test_db")
+    yield manager
+    for engine in engines.values():
+        manager.run(engine.dispose())
+
+
+@pytest.fixture
+def items(db, pg_schema):
+    table = f"{pg_schema}.items"
+    ok, message = db.execute_script([
+        (f"""
+            CREATE TABLE {table} (
+                id SERIAL PRIMARY KEY,
+                name TEXT,
+                amount NUMERIC(10, 2),
+                created_at TIMESTAMP DEFAULT LOCALTIMESTAMP
+            )
+        """, None),
+        (f"""
+            INSERT INTO {table} (name, amount)
+            SELECT 'item ' || g, g * 1.5 FROM generate_series(1, 50) g
+        """, None),
+    ])
+    assert ok, message
+    return table
+
+
+def test_fetch_data_matches_sync(db, adb, items):
+    query = f"SELECT * FROM {items} WHERE id <= :max_id ORDER BY id"
+    expected = db.fetch_data(query, {"max_id": 20}, ttl=0)
+    actual = adb.run(adb.fetch_data(query, {"max_id": 20}, ttl=0))
+    pd.testing.assert_frame_equal(actual, expected)
+
+
+def test_cache_is_shared_and_invalidated_by_writes(db, adb, items):
+    query = f"SELECT COUNT(*) AS n FROM {items}"
+    assert adb.run(adb.fetch_data(query, ttl=60))["n"].iloc[0] == 50
+
+    # Cached: a write the cache does not hear about is not visible
+    with db._get_engine().begin() as conn:
+        conn.exec_driver_sql(f"DELETE FROM {items} WHERE id = 1")
+    assert adb.run(adb.fetch_data(query, ttl=60))["n"].iloc[0] == 50
+    # The sync manager reads the same cache entry
+    assert db.fetch_data(query, ttl=60)["n"].iloc[0] == 50
+
+    ok, message = adb.run(adb.execute_query(f"DELETE FROM {items} WHERE id = :id", {"id": 2}))
+    assert ok, message
+    assert adb.run(adb.fetch_data(query, ttl=60))["n"].iloc[0] == 48
+
+
+def test_fetch_many(adb, items):
+    results = adb.run(adb.fetch_many({
+        "count": f"SELECT COUNT(*) AS n FROM {items}",
+        "first": (f"SELECT name FROM {items} WHERE id = :id", {"id": 1}),
+        "broken": f"SELECT missing_column FROM {items}",
+    }, ttl=0))
+
+    assert list(results) == ["count", "first", "broken"]
+    assert results["count"]["n"].iloc[0] == 50
+    assert results["first"]["name"].iloc[0] == "item 1"
+    # Failures come back empty, like fetch_data
+    assert results["broken"].empty
+
+
+def test_fetch_data_timeout(adb):
+    assert adb.run(adb.fetch_data("SELECT pg_sleep(2) AS slept", ttl=0, timeout=0.2)).empty
+
+
+def test_execute_many(adb, items):
+    results = adb.run(adb.execute_many([
+        (f"UPDATE {items} SET amount = 0 WHERE id = :id", {"id": 3}),
+        (f"INSERT INTO {items} (name, amount) VALUES (:name, 1)", {"name": "new"}),
+        (f"UPDATE {items} SET missing_column = 1", None),
+    ]))
+
+    assert [ok for ok, _ in results] == [True, True, False]
+    assert results[2][1].startswith("❌ Write Error")
+    frame = adb.run(adb.fetch_data(f"SELECT id, amount FROM {items} WHERE id = 3 OR name = 'new'", ttl=0))
+    assert len(frame) == 2 and float(frame.loc[frame["id"] == 3, "amount"].iloc[0]) == 0
@@ -0,0 +1,90 @@
+"""Upload validation (pure pandas) and COPY + upsert into a serial table."""
+import pandas as pd
+
+from database import bulk_load
+
+SCHEMA = pd.DataFrame([
+    ("id", "integer", False, "nextval('items_id_seq'::regclass)", True, 1),
+    ("name", "text", False, None, False, 2),
+    ("amount", "numeric", True, None, False, 3),
+], columns=['column_name', 'data_type', 'is_nullable', 'column_default', 'is_primary_key', 'ordinal_position'])
+
+
+def _upload(**columns) -> pd.DataFrame:
+    # read_upload reads CSVs as strings
+    return pd.DataFrame(columns, dtype="object")
+
+
+def test_duplicate_primary_keys_are_row_errors():
+    df = _upload(id=["1", "2", "01", None, None], name=["a", "b", "c", "d", "e"])
+    valid, errors, file_errors = bulk_load.validate_frame(df, SCHEMA)
+
+    assert file_errors == []
+    # "1" and "01" are the same key once converted; rows without a key are new records
+    assert valid["name"].tolist() == ["b", "d", "e"]
+    assert errors[["row", "column", "error"]].values.tolist() == [
+        [2, "id", "duplicate primary key"],
+        [4, "id", "duplicate primary key"],
+    ]
+
+
+def test_values_are_converted_per_column():
+    df = _upload(id=["1", "2"], name=["a", " b "], amount=["1.5", None])
+    valid, errors, file_errors = bulk_load.validate_frame(df, SCHEMA)
+
+    assert errors.empty and file_errors == []
+    assert valid["id"].dtype == "Int64" and valid["id"].tolist() == [1, 2]
+    assert valid["amount"].iloc[0] == 1.5 and pd.isna(valid["amount"].iloc[1])
+    assert valid["name"].tolist() == ["a", " b "]  # text is stored as uploaded
+
+
+def test_bad_cells_are_reported_with_file_line_numbers():
+    df = _upload(id=["1", "x", "3.5", "4"], name=["a", "b", "c", None], amount=["1", "2", "abc", "4"])
+    valid, errors, _ = bulk_load.validate_frame(df, SCHEMA)
+
+    assert valid["id"].tolist() == [1]
+    # Line 1 is the header, so the second data row is line 3
+    assert errors[["row", "column", "value", "error"]].values.tolist() == [
+        [3, "id", "x", "not an integer"],
+        [4, "amount", "abc", "not a number"],
+        [4, "id", "3.5", "not an integer"],
+        [5, "name", None, "required value is empty"],
+    ]
+
+
+def test_file_errors_block_the_upload():
+    valid, errors, file_errors = bulk_load.validate_frame(_upload(amount=["1"], colour=["red"]), SCHEMA)
+
+    assert valid.empty and errors.empty
+    assert file_errors == ["Unknown columns: colour", "Missing required columns: name"]
+
+
+def test_created_at_is_filled_when_the_table_has_one():
+    schema = pd.concat([SCHEMA, pd.DataFrame([("created_at", "timestamp without time zone", True, None, False, 4)],
+                                             columns=SCHEMA.columns)], ignore_index=True)
+    valid, errors, file_errors = bulk_load.validate_frame(_upload(name=["a"]), schema)
+    assert errors.empty and file_errors == []
+    assert valid["created_at"].notna().all()
+
+
+def test_load_advances_the_serial_sequence(db, pg_schema):
+    table = f"{pg_schema}.items"
+    ok, message = db.execute_query(f"CREATE TABLE {table} (id SERIAL PRIMARY KEY, name TEXT NOT NULL, amount NUMERIC)")
+    assert ok, message
+
+    valid, errors, _ = bulk_load.validate_frame(_upload(id=["5", "40"], name=["a", "b"]), SCHEMA)
+    assert errors.empty
+    result = bulk_load.load_frame(db, table, valid, SCHEMA)
+    assert result["ok"], result["message"]
+
+    ok, message = db.execute_query(f"INSERT INTO {table} (name) VALUES ('default id')")
+    assert ok, message
+    frame = db.fetch_data(f"SELECT id FROM {table} WHERE name = 'default id'", ttl=0)
+    assert frame["id"].iloc[0] == 41
+
+    # Loading smaller ids later never moves the sequence back
+    valid, _, _ = bulk_load.validate_frame(_upload(id=["3"], name=["c"]), SCHEMA)
+    assert bulk_load.load_frame(db, table, valid, SCHEMA)["ok"]
+    ok, message = db.execute_query(f"INSERT INTO {table} (name) VALUES ('next id')")
+    assert ok, message
+    assert db.fetch_data(f"SELECT MAX(id) AS id FROM {table}", ttl=0)["id"].iloc[0] == 42
@@ -0,0 +1,70 @@
+"""DatabaseManager reads: dtype compaction stays out of the editing grids."""
+import pytest
+
+from database import db_manager
+
+
+@pytest.fixture
+def statuses(db, pg_schema, monkeypatch):
+    monkeypatch.setattr(db_manager, "compaction_enabled", lambda connection_name: True)
+    table = f"{pg_schema}.statuses"
+    ok, message = db.execute_script([
+        (f"CREATE TABLE {table} (id SERIAL PRIMARY KEY, status TEXT)", None),
+        (f"INSERT INTO {table} (status) SELECT (ARRAY['SUCCESS', 'FAILED'])[1 + g % 2] "
+         f"FROM generate_series(1, 100) g", None),
+    ])
+    assert ok, message
+    return table
+
+
+def test_fetch_data_compacts(db, statuses):
+    assert db.fetch_data(f"SELECT * FROM {statuses} ORDER BY id LIMIT :page_limit",
+                         {"page_limit": 100})["status"].dtype == "category"
+
+
+def test_fetch_page_does_not_compact(db, statuses):
+    # Same SQL as the compacted read above, which is cached first: the entries must not be shared
+    db.fetch_data(f"SELECT * FROM {statuses} ORDER BY id LIMIT :page_limit", {"page_limit": 100})
+    assert db.fetch_page(statuses, 100)["status"].dtype == object
+    assert db.fetch_page(statuses, 100, compact=True)["status"].dtype == "category"
+
+
+def test_fetch_batch_compact_flag(db, statuses):
+    query = f"SELECT status FROM {statuses}"
+    assert db.fetch_batch({"rows": query})["rows"]["status"].dtype == "category"
+    assert db.fetch_batch({"rows": query}, compact=False)["rows"]["status"].dtype == object
+
+
+def test_arrow_backend_binds_parameters(db, statuses):
+    pytest.importorskip("adbc_driver_postgresql")
+    query = (f"SELECT id, status, :label AS label FROM {statuses} "
+             f"WHERE status = ANY(:statuses) AND id <= :max_id ORDER BY id")
+    params = {"label": "it's 100% quoted", "statuses": ["FAILED"], "max_id": 10}
+    expected = db.fetch_data(query, params, ttl=0, compact=False)
+
+    def no_psycopg2(*args, **kwargs):
+        raise AssertionError("the arrow read checked out a psycopg2 connection")
+
+    # Parameters are bound by ADBC; if the arrow path needed the pool (or fell back to it) the read fails
+    with pytest.MonkeyPatch.context() as patch:
+        patch.setattr(db._get_engine(), "connect", no_psycopg2)
+        arrow = db.fetch_data(query, params, ttl=0, backend="arrow", compact=False)
+    assert len(arrow) == 5
+    assert arrow.astype(object).values.tolist() == expected.astype(object).values.tolist()
+
+
+def test_arrow_connections_keep_session_timeouts(pg_engine):
+    pytest.importorskip("adbc_driver_postgresql")
+    from sqlalchemy import create_engine
+
+    from database.arrow_reader import read_arrow
+
+    # get_engine puts the configured timeouts in the URL as libpq options
+    options = "-c statement_timeout=1234 -c idle_in_transaction_session_timeout=5min"
+    engine = create_engine(pg_engine.url.update_query_dict({"options": options}))
+    try:
+        settings = read_arrow(engine, "timeouts_db", "SELECT current_setting('statement_timeout') AS statement, "
+                                                    "current_setting('idle_in_transaction_session_timeout') AS idle")
+    finally:
+        engine.dispose()
+    assert settings.astype(object).values.tolist() == [["1234ms", "5min"]]
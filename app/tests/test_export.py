@@ -0,0 +1,60 @@
+"""Streamed exports: every chunk fits the file's schema, empty results still get their columns."""
+import json
+
+import pandas as pd
+import pytest
+
+from utils import export
+
+
+def _no_progress(rows):
+    pass
+
+
+def test_parquet_nested_values_are_json_text(tmp_path):
+    pq = pytest.importorskip("pyarrow.parquet")
+    chunks = [
+        pd.DataFrame({"id": [1, 2], "payload": [{"a": 1}, None]}),
+        # A key that only appears later, then a list where a dict was: both broke the struct schema
+        pd.DataFrame({"id": [3], "payload": [{"a": 2, "b": "new"}]}),
+        pd.DataFrame({"id": [4], "payload": [[1, 2]]}),
+    ]
+    path = tmp_path / "nested.parquet"
+
+    assert export._write_parquet(iter(chunks), path, _no_progress) == 4
+    payloads = pq.read_table(path).column("payload").to_pylist()
+    assert payloads[1] is None
+    assert [json.loads(p) for p in payloads if p is not None] == [{"a": 1}, {"a": 2, "b": "new"}, [1, 2]]
+
+
+def test_parquet_empty_result_keeps_columns(tmp_path):
+    pq = pytest.importorskip("pyarrow.parquet")
+    path = tmp_path / "empty.parquet"
+
+    assert export._write_parquet(iter([pd.DataFrame(columns=["id", "name"])]), path, _no_progress) == 0
+    table = pq.read_table(path)
+    assert table.num_rows == 0 and table.column_names == ["id", "name"]
+
+
+def test_csv_empty_result_has_header(tmp_path):
+    path = tmp_path / "empty.csv"
+    with open(path, "w", encoding="utf-8", newline="") as handle:
+        assert export._write_csv(iter([pd.DataFrame(columns=["id", "name"])]), handle, _no_progress) == 0
+    assert path.read_text() == "id,name\n"
+
+
+@pytest.mark.parametrize("fmt", list(export.EXPORT_FORMATS))
+def test_export_of_an_empty_query(db, fmt, tmp_path, monkeypatch):
+    monkeypatch.setattr(export, "EXPORT_DIR", str(tmp_path))
+    if fmt == "Parquet":
+        pytest.importorskip("pyarrow")
+
+    result = export.export_query(
+        db, "SELECT g AS id, 'x'::text AS name FROM generate_series(1, 3) g WHERE g > :n", {"n": 5}, fmt=fmt
+    )
+    assert result["rows"] == 0
+    if fmt == "Parquet":
+        assert pd.read_parquet(result["path"]).columns.tolist() == ["id", "name"]
+    else:
+        assert pd.read_csv(result["path"]).columns.tolist() == ["id", "name"]
+    export.read_and_remove(result["path"])
@@ -0,0 +1,59 @@
+"""Grid editing: st.data_editor state -> row changes, and patching the page's rows (no database needed)."""
+import pandas as pd
+
+from database.grid_edit import diff_editor_state, patch_frame
+
+
+def _rows() -> pd.DataFrame:
+    return pd.DataFrame({
+        "id": [10, 11, 12],
+        "name": ["Kompas", "Detik", "Tempo"],
+        "url": ["kompas.com", None, "tempo.co"],
+        "created_at": pd.to_datetime(["2024-01-01"] * 3),
+    })
+
+
+def test_only_changed_cells_become_updates():
+    state = {"edited_rows": {
+        0: {"name": "Kompas"},                   # unchanged value
+        1: {"url": "", "name": "detik"},         # "" is NULL, like the stored None
+        "2": {"url": "tempo.id", "id": 99, "created_at": "2025-01-01"},  # read-only columns ignored
+    }}
+    updates, inserts, deletes = diff_editor_state(_rows(), state)
+
+    assert updates == {11: {"name": "detik"}, 12: {"url": "tempo.id"}}
+    assert inserts == [] and deletes == []
+    assert all(type(k) is int for k in updates)
+
+
+def test_added_and_deleted_rows():
+    state = {
+        "added_rows": [{"name": "Antara", "url": "", "id": 5}, {"name": "", "url": None}],
+        "deleted_rows": [2, 0],
+    }
+    updates, inserts, deletes = diff_editor_state(_rows(), state)
+
+    # Blank rows are skipped, read-only columns dropped, empty text becomes NULL
+    assert inserts == [{"name": "Antara", "url": None}]
+    assert deletes == [12, 10] and all(type(k) is int for k in deletes)
+    assert updates == {}
+
+
+def test_patch_frame_keeps_order():
+    refreshed = pd.DataFrame({
+        "id": [11, 13],
+        "name": ["detik", "Antara"],
+        "url": ["detik.com", None],
+        "created_at": pd.to_datetime(["2024-01-01", "2025-01-01"]),
+        "server_only": [1, 2],
+    })
+    patched = patch_frame(_rows(), refreshed, deleted=[10])
+
+    assert patched["id"].tolist() == [11, 12, 13]
+    assert patched["name"].tolist() == ["detik", "Tempo", "Antara"]
+    assert patched.columns.tolist() == ["id", "name", "url", "created_at"]
+
+
+def test_patch_frame_everything_deleted():
+    patched = patch_frame(_rows(), pd.DataFrame(), deleted=[10, 11, 12])
+    assert patched.empty and patched.columns.tolist() == _rows().columns.tolist()
@@ -0,0 +1,42 @@
+"""summarize_news_kpis: shaping the GROUPING SETS result (no database needed)."""
+import pandas as pd
+
+from database.kpi_queries import summarize_news_kpis
+
+
+def _kpi_rows() -> pd.DataFrame:
+    # One row per failure_code plus the grand total (is_total = 1), as news_kpi_query returns them
+    return pd.DataFrame({
+        "is_total": [0, 0, 0, 0, 1],
+        "failure_code": ["NO_PORTAL", None, "BAD_SEL", "TIMEOUT", None],
+        "total_sources": [4, 90, 3, 2, 99],
+        "total_success": [0, 90, 0, 0, 90],
+        "total_failed": [4, 0, 3, 2, 9],
+        "latest_updated": pd.to_datetime(["2024-03-01", "2024-03-09", "2024-03-02", "2024-03-03", "2024-03-09"]),
+    })
+
+
+def test_totals_and_failures_by_code():
+    kpis = summarize_news_kpis(_kpi_rows())
+
+    assert (kpis["total_sources"], kpis["total_success"], kpis["total_failed"]) == (99, 90, 9)
+    assert kpis["latest_updated"] == pd.Timestamp("2024-03-09")
+    assert all(type(kpis[k]) is int for k in ("total_sources", "total_success", "total_failed"))
+    # Only the configured codes, sorted; codes without failures are simply absent
+    assert kpis["failures_by_code"].to_dict("records") == [
+        {"failure_code": "BAD_SEL", "total_failures": 3},
+        {"failure_code": "NO_PORTAL", "total_failures": 4},
+    ]
+
+
+def test_custom_failure_codes():
+    kpis = summarize_news_kpis(_kpi_rows(), ["TIMEOUT"])
+    assert kpis["failures_by_code"]["failure_code"].tolist() == ["TIMEOUT"]
+
+
+def test_empty_result():
+    # fetch_data returns an empty frame on errors; an empty table has no grand-total row either
+    for df in (pd.DataFrame(), _kpi_rows().iloc[0:0]):
+        kpis = summarize_news_kpis(df)
+        assert (kpis["total_sources"], kpis["total_failed"], kpis["latest_updated"]) == (0, 0, None)
+        assert kpis["failures_by_code"].columns.tolist() == ["failure_code", "total_failures"]
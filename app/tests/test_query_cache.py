@@ -0,0 +1,114 @@
+"""QueryCache: copy-on-write views, TTL, invalidation and LRU eviction (no database needed)."""
+import pandas as pd
+import pytest
+
+from database import query_cache
+from database.query_cache import QueryCache, frame_bytes, make_key, tables_in, tables_written
+
+
+@pytest.fixture(autouse=True)
+def copy_on_write():
+    # As set at app startup in utils/init_db.py
+    with pd.option_context("mode.copy_on_write", True):
+        yield
+
+
+def _frame(n: int = 1000, label: str = "x") -> pd.DataFrame:
+    return pd.DataFrame({"id": range(n), "label": [f"{label}{i}" for i in range(n)]})
+
+
+def _key(name: str) -> tuple:
+    return make_key("test_db", f"SELECT * FROM {name}")
+
+
+def test_views_are_copy_on_write():
+    cache = QueryCache()
+    cache.put(_key("t"), _frame(), ttl=60, tables={"t"})
+
+    view = cache.get(_key("t"))
+    view.loc[0, "label"] = "changed"
+    view["extra"] = 1
+
+    fresh = cache.get(_key("t"))
+    assert fresh.loc[0, "label"] == "x0"
+    assert "extra" not in fresh.columns
+    assert cache.stats()["shared_views"] == 2
+
+
+def test_caller_edits_after_put_do_not_reach_the_cache():
+    cache = QueryCache()
+    df = _frame()
+    cache.put(_key("t"), df, ttl=60, tables={"t"})
+    df.loc[0, "id"] = -1
+    assert cache.get(_key("t")).loc[0, "id"] == 0
+
+
+def test_expired_entries_miss(monkeypatch):
+    now = [1000.0]
+    monkeypatch.setattr(query_cache.time, "monotonic", lambda: now[0])
+    cache = QueryCache()
+    cache.put(_key("t"), _frame(), ttl=60, tables={"t"})
+
+    now[0] += 59
+    assert cache.get(_key("t")) is not None
+    now[0] += 2
+    assert cache.get(_key("t")) is None
+    assert (cache.hits, cache.misses) == (1, 1)
+    assert cache.stats()["entries"] == 0
+
+
+def test_ttl_zero_is_not_cached():
+    cache = QueryCache()
+    cache.put(_key("t"), _frame(), ttl=0, tables={"t"})
+    assert cache.get(_key("t")) is None
+
+
+def test_invalidate_by_table_and_connection():
+    cache = QueryCache()
+    cache.put(_key("a"), _frame(), ttl=60, tables={"a"})
+    cache.put(_key("b"), _frame(), ttl=60, tables={"b"})
+    other = make_key("other_db", "SELECT * FROM a")
+    cache.put(other, _frame(), ttl=60, tables={"a"})
+
+    assert cache.invalidate({"public.A"}, connection_name="test_db") == 1
+    assert cache.get(_key("a")) is None
+    assert cache.get(other) is not None
+    assert cache.invalidate() == 2
+    assert cache.stats()["bytes"] == 0
+
+
+def _cached(cache: QueryCache) -> set[str]:
+    """Queries currently cached (read from the stats, so the LRU order is untouched)."""
+    return {row["query"] for row in cache.datasets() if row["cached"]}
+
+
+def test_lru_eviction_prefers_unreferenced_entries():
+    size = frame_bytes(_frame())
+    cache = QueryCache(max_bytes=int(size * 2.5))
+    cache.put(_key("a"), _frame(), ttl=60, tables={"a"})
+    cache.put(_key("b"), _frame(), ttl=60, tables={"b"})
+    # "a" is the least recently used, but a session still holds a view of it
+    in_use = cache.get(_key("a"))
+    cache.get(_key("b"))  # a view that is dropped right away
+
+    cache.put(_key("c"), _frame(), ttl=60, tables={"c"})
+    assert _cached(cache) == {"SELECT * FROM a", "SELECT * FROM c"}
+    assert cache.stats()["bytes"] <= cache.max_bytes
+
+    # Once the view is gone "a" is the plain LRU entry again
+    del in_use
+    cache.put(_key("d"), _frame(), ttl=60, tables={"d"})
+    assert _cached(cache) == {"SELECT * FROM c", "SELECT * FROM d"}
+
+
+def test_results_over_budget_are_not_cached():
+    cache = QueryCache(max_bytes=frame_bytes(_frame()) // 2)
+    cache.put(_key("t"), _frame(), ttl=60, tables={"t"})
+    assert cache.stats()["entries"] == 0
+
+
+def test_table_extraction():
+    query = 'SELECT * FROM public."News" n JOIN from_news.source_status s ON s.id = n.id'
+    assert tables_in(query) == {"news", "from_news.source_status"}
+    assert tables_written("UPDATE social.monitoring SET x = 1") == {"social.monitoring"}
+    assert make_key("c", "SELECT  1\n") == make_key("c", "SELECT 1")
@@ -0,0 +1,144 @@
+"""Incremental refreshes of database/rollup.py must always equal a full GROUP BY."""
+import pandas as pd
+import pytest
+
+from database import rollup
+
+ROLLUP_COLUMNS = [
+    "platform", "mention_date", "total_scraped", "total_filtered",
+    "success_count", "row_count", "last_updated", "scraping_status",
+]
+
+FULL_GROUP_BY = """
+    SELECT
+        platform,
+        mention_date,
+        COALESCE(SUM(scraped_count), 0) AS total_scraped,
+        COALESCE(SUM(filtered_count), 0) AS total_filtered,
+        COUNT(*) FILTER (WHERE scraping_status = 'SUCCESS') AS success_count,
+        COUNT(*) AS row_count,
+        MAX(last_updated) AS last_updated,
+        MAX(scraping_status) AS scraping_status
+    FROM {source}
+    GROUP BY platform, mention_date
+"""
+
+
+@pytest.fixture
+def tables(db, pg_schema, monkeypatch):
+    """Rollup objects in the test schema, over a small source table."""
+    names = {
+        "SOURCE_TABLE": f"{pg_schema}.monitoring",
+        "ROLLUP_TABLE": f"{pg_schema}.monitoring_daily",
+        "WATERMARK_TABLE": f"{pg_schema}.rollup_watermarks",
+        "DIRTY_TABLE": f"{pg_schema}.monitoring_daily_dirty",
+    }
+    for name, value in names.items():
+        monkeypatch.setattr(rollup, name, value)
+
+    ok, message = db.execute_script([
+        (f"""
+            CREATE TABLE {names['SOURCE_TABLE']} (
+                id SERIAL PRIMARY KEY,
+                platform TEXT,
+                mention_date DATE,
+                scraped_count INT,
+                filtered_count INT,
+                scraping_status TEXT,
+                last_updated TIMESTAMP
+            )
+        """, None),
+        (f"""
+            INSERT INTO {names['SOURCE_TABLE']}
+                (platform, mention_date, scraped_count, filtered_count, scraping_status, last_updated)
+            SELECT
+                (ARRAY['Facebook', 'Twitter', 'TikTok'])[1 + g % 3],
+                CURRENT_DATE - g % 5,
+                10 + g % 7,
+                g % 3,
+                CASE WHEN g % 4 = 0 THEN 'FAILED' ELSE 'SUCCESS' END,
+                LOCALTIMESTAMP - make_interval(hours => g % 48)
+            FROM generate_series(1, 300) g
+        """, None),
+    ])
+    assert ok, message
+    ok, message = rollup.setup_rollup(db)
+    assert ok, message
+    return names
+
+
+def _frame(db, query: str) -> pd.DataFrame:
+    df = db.fetch_data(query, ttl=0)
+    df = df[ROLLUP_COLUMNS].astype({"total_scraped": "int64", "total_filtered": "int64",
+                                    "success_count": "int64", "row_count": "int64"})
+    return df.sort_values(["platform", "mention_date"]).reset_index(drop=True)
+
+
+def assert_matches_full_group_by(db, tables):
+    ok, message = rollup.refresh_rollup(db)
+    assert ok, message
+    expected = _frame(db, FULL_GROUP_BY.format(source=tables["SOURCE_TABLE"]))
+    actual = _frame(db, f"SELECT * FROM {tables['ROLLUP_TABLE']}")
+    pd.testing.assert_frame_equal(actual, expected)
+
+
+def test_refresh_statements_run_no_ddl():
+    # Page views refresh the rollup: no locks beyond the upsert, no DDL rights needed
+    for query, _ in rollup._refresh_statements() + rollup._refresh_statements(full=True):
+        assert not query.lstrip().upper().startswith(("CREATE", "DROP", "ALTER"))
+
+
+def test_first_refresh_builds_every_group(db, tables):
+    assert_matches_full_group_by(db, tables)
+
+
+def test_inserts_and_updates(db, tables):
+    assert_matches_full_group_by(db, tables)
+    source = tables["SOURCE_TABLE"]
+    ok, message = db.execute_script([
+        (f"""
+            INSERT INTO {source} (platform, mention_date, scraped_count, filtered_count, scraping_status, last_updated)
+            VALUES ('YouTube', CURRENT_DATE, 5, 1, 'SUCCESS', LOCALTIMESTAMP),
+                   ('Facebook', CURRENT_DATE - 1, 3, 0, 'FAILED', LOCALTIMESTAMP)
+        """, None),
+        (f"UPDATE {source} SET scraped_count = scraped_count + 100, last_updated = LOCALTIMESTAMP "
+         f"WHERE id % 10 = 0", None),
+    ])
+    assert ok, message
+    assert_matches_full_group_by(db, tables)
+
+
+def test_late_commit_with_older_last_updated(db, tables):
+    # A scraper transaction that began before the refresh but committed after it
+    assert_matches_full_group_by(db, tables)
+    ok, message = db.execute_query(f"""
+        INSERT INTO {tables['SOURCE_TABLE']}
+            (platform, mention_date, scraped_count, filtered_count, scraping_status, last_updated)
+        VALUES ('Twitter', CURRENT_DATE - 2, 999, 0, 'SUCCESS', LOCALTIMESTAMP - INTERVAL '1 minute')
+    """)
+    assert ok, message
+    assert_matches_full_group_by(db, tables)
+
+
+def test_deletes_and_moves(db, tables):
+    assert_matches_full_group_by(db, tables)
+    source = tables["SOURCE_TABLE"]
+    ok, message = db.execute_script([
+        # Old rows (below the watermark) leaving their groups, one group emptied entirely
+        (f"DELETE FROM {source} WHERE id % 7 = 0", None),
+        (f"DELETE FROM {source} WHERE platform = 'TikTok' AND mention_date = CURRENT_DATE - 4", None),
+        (f"UPDATE {source} SET platform = 'Instagram' WHERE id % 11 = 0", None),
+        (f"UPDATE {source} SET mention_date = mention_date - 30 WHERE id % 13 = 0", None),
+    ])
+    assert ok, message
+    assert_matches_full_group_by(db, tables)
+    assert db.fetch_data(f"SELECT COUNT(*) AS n FROM {tables['DIRTY_TABLE']}", ttl=0)["n"].iloc[0] == 0
+
+
+def test_full_refresh(db, tables):
+    assert_matches_full_group_by(db, tables)
+    ok, message = db.execute_query(f"TRUNCATE {tables['SOURCE_TABLE']}")
+    assert ok, message
+    ok, message = rollup.refresh_rollup(db, full=True)
+    assert ok, message
+    assert db.fetch_data(f"SELECT COUNT(*) AS n FROM {tables['ROLLUP_TABLE']}", ttl=0)["n"].iloc[0] == 0
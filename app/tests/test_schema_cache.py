@@ -0,0 +1,59 @@
+"""SchemaCache must cache successful catalog reads only (no database needed)."""
+import pandas as pd
+
+from database.schema_cache import SchemaCache
+
+
+class FakeDb:
+    """Answers the catalog query with `frames`, in order; an empty frame is what fetch_data returns on errors."""
+
+    connection_name = "fake_db"
+
+    def __init__(self, *frames):
+        self.frames = list(frames)
+        self.calls = 0
+
+    def fetch_data(self, query, params=None, ttl=None, compact=True):
+        self.calls += 1
+        return self.frames.pop(0)
+
+
+def _catalog(*rows) -> pd.DataFrame:
+    return pd.DataFrame(rows, columns=[
+        'table_schema', 'table_name', 'column_name', 'data_type',
+        'is_nullable', 'column_default', 'is_primary_key', 'ordinal_position',
+    ])
+
+
+ITEMS = _catalog(
+    ("public", "items", "id", "integer", False, "nextval('items_id_seq')", True, 1),
+    ("public", "items", "name", "text", True, None, False, 2),
+)
+
+
+def test_failed_catalog_read_is_not_cached():
+    db = FakeDb(pd.DataFrame(), ITEMS)
+    cache = SchemaCache(ttl=3600)
+
+    assert not cache.load(db, ["items"])
+    assert cache.get(db, "items")["column_name"].tolist() == ["id", "name"]
+    assert db.calls == 2
+
+
+def test_successful_read_is_cached_including_missing_tables():
+    db = FakeDb(ITEMS)
+    cache = SchemaCache(ttl=3600)
+
+    assert cache.load(db, ["items", "public.missing"])
+    assert cache.get(db, "public.items")["is_primary_key"].tolist() == [True, False]
+    assert cache.get(db, "missing").empty
+    assert db.calls == 1
+
+
+def test_empty_catalog_is_a_successful_read():
+    db = FakeDb(_catalog())
+    cache = SchemaCache(ttl=3600)
+
+    assert cache.load(db, ["missing"])
+    assert cache.get(db, "missing").empty
+    assert db.calls == 1
@@ -0,0 +1,65 @@
+"""build_search_filter: every generated condition is parameterized and indexable (no database needed)."""
+import pandas as pd
+
+from database.search import build_search_filter, escape_like
+
+SCHEMA = pd.DataFrame([
+    ("id", "integer", True),
+    ("name", "text", False),
+    ("url", "character varying", False),
+    ("articles", "integer", False),
+    ("updated_at", "timestamp without time zone", False),
+], columns=['column_name', 'data_type', 'is_primary_key'])
+
+
+def test_contains_on_a_text_column_is_bare():
+    where, params = build_search_filter(SCHEMA, "name", "Kompas")
+    assert where == '"name" ILIKE :search_pattern'
+    assert params == {"search_pattern": "%Kompas%"}
+
+
+def test_contains_on_other_columns_casts_to_text():
+    where, _ = build_search_filter(SCHEMA, "updated_at", "2024-01")
+    assert where == '"updated_at"::text ILIKE :search_pattern'
+
+
+def test_like_wildcards_match_literally():
+    assert escape_like(r"50%_off\now") == r"50\%\_off\\now"
+    _, params = build_search_filter(SCHEMA, "name", "100%")
+    assert params["search_pattern"] == r"%100\%%"
+
+
+def test_all_searches_text_columns_only():
+    where, params = build_search_filter(SCHEMA, "All", "news")
+    assert where == '"name" ILIKE :search_pattern OR "url" ILIKE :search_pattern'
+    assert params == {"search_pattern": "%news%"}
+
+
+def test_all_with_a_number_also_matches_integer_keys():
+    where, params = build_search_filter(SCHEMA, "All", " 42 ")
+    assert where.endswith('OR "id" = :search_number')
+    assert '"articles"' not in where
+    assert params["search_number"] == 42
+
+
+def test_all_with_a_number_too_big_for_bigint():
+    where, params = build_search_filter(SCHEMA, "All", "9" * 19)
+    assert "search_number" not in params and ":search_number" not in where
+
+
+def test_all_without_searchable_columns_matches_nothing():
+    numbers_only = SCHEMA[SCHEMA["data_type"] == "integer"].assign(is_primary_key=False)
+    assert build_search_filter(numbers_only, "All", "news") == ("FALSE", {})
+
+
+def test_fulltext():
+    where, params = build_search_filter(SCHEMA, "All", "breaking news", mode="fulltext")
+    assert where.count("@@ plainto_tsquery('simple', :search_query)") == 2
+    assert "to_tsvector('simple', coalesce(\"url\", ''))" in where
+    assert params == {"search_query": "breaking news"}
+
+
+def test_fulltext_on_a_non_text_column_falls_back_to_contains():
+    where, params = build_search_filter(SCHEMA, "articles", "12", mode="fulltext")
+    assert where == '"articles"::text ILIKE :search_pattern'
+    assert params == {"search_pattern": "%12%"}
@@ -0,0 +1,75 @@
+"""trend_matrix densification: the pandas path and the SQL-grid path give the same matrices (no database needed)."""
+from datetime import datetime
+
+import pandas as pd
+import pytest
+
+from database import trends
+
+END = datetime(2024, 3, 10, 15, 30)
+
+# Sparse daily aggregates, as the rollup returns them
+SPARSE = pd.DataFrame({
+    "bucket": pd.to_datetime(["2024-03-04", "2024-03-04", "2024-03-08", "2024-03-10", "2024-02-01"]),
+    "platform": ["Twitter", "Facebook", "Twitter", "TikTok", "Twitter"],
+    "count": [5, 2, 7, 1, 100],
+})
+
+
+class FakeDb:
+    """Answers both trend queries from SPARSE, the way Postgres would."""
+
+    def fetch_data(self, query, params=None, ttl=None):
+        start, stop = pd.Timestamp(params.get("start")), pd.Timestamp(params.get("stop"))
+        rows = SPARSE[(SPARSE["bucket"] >= start) & (SPARSE["bucket"] < stop)]
+        if "platforms" in params:
+            rows = rows[rows["platform"].isin(params["platforms"])]
+        if "generate_series" not in query:
+            return rows.reset_index(drop=True)
+
+        # dense_trend_query: grid x platforms (ordered by bucket, platform) with running totals
+        grid = pd.date_range(params["first"], params["last"], freq=pd.Timedelta(params["step"]))
+        platforms = sorted(params["platforms"] if "platforms" in params else rows["platform"].unique())
+        dense = pd.MultiIndex.from_product([grid, platforms], names=["Date", "platform"]).to_frame(index=False)
+        dense = dense.merge(rows.rename(columns={"bucket": "Date"}), how="left", on=["Date", "platform"])
+        dense["data_cells"] = dense["count"].notna().sum()
+        dense["count"] = dense["count"].fillna(0).astype("int64")
+        dense["running"] = dense.groupby("platform")["count"].cumsum()
+        return dense
+
+
+@pytest.fixture(params=["pandas", "sql"])
+def path(request, monkeypatch):
+    monkeypatch.setattr(trends, "TREND_SQL_MIN_BUCKETS", 10_000 if request.param == "pandas" else 0)
+    return request.param
+
+
+def test_window_is_dense(path):
+    counts, running = trends.trend_matrix(FakeDb(), days=7, end=END)
+
+    assert counts["Date"].tolist() == list(pd.date_range("2024-03-04", "2024-03-10", freq="D"))
+    assert counts.columns.tolist() == ["Date", "Facebook", "TikTok", "Twitter"]
+    assert counts["Twitter"].tolist() == [5, 0, 0, 0, 7, 0, 0]
+    assert running["Twitter"].tolist() == [5, 5, 5, 5, 12, 12, 12]
+    assert running.iloc[-1, 1:].tolist() == [2, 1, 12]
+    assert (counts.dtypes.iloc[1:] == "int64").all()
+
+
+def test_requested_platforms_keep_their_order(path):
+    counts, running = trends.trend_matrix(FakeDb(), days=7, end=END, platforms=["Twitter", "YouTube"])
+
+    assert counts.columns.tolist() == ["Date", "Twitter", "YouTube"]
+    assert counts["YouTube"].sum() == 0
+    assert running["Twitter"].iloc[-1] == 12
+
+
+def test_window_without_data_is_empty(path):
+    counts, running = trends.trend_matrix(FakeDb(), days=7, end=datetime(2023, 1, 1))
+    assert counts.empty and running.empty
+
+
+def test_trend_window():
+    hours = trends.trend_window(2, "hour", end=END)
+    assert len(hours) == 48 and hours[-1] == pd.Timestamp("2024-03-10 15:00")
+    days = trends.trend_window(30, "day", end=END)
+    assert len(days) == 30 and days[-1] == pd.Timestamp("2024-03-10")
@@ -1,21 +1,40 @@
+import copy
+import os
+import time
 import streamlit as st
 import streamlit_authenticator as stauth
 import yaml
 from yaml.loader import SafeLoader
 
+AUTH_CONFIG_PATH = 'config.yaml'
+
+
+@st.cache_resource(max_entries=4)
+def _load_auth_config(path: str, mtime: float) -> dict:
+    """Parsed config.yaml, shared by every session; the mtime in the key reloads it when the file changes."""
+    with open(path) as file:
+        return yaml.load(file, Loader=SafeLoader)
+
+
 def get_authenticator():
-    """Loads config and returns the authenticator object."""
-    with open('config.yaml') as file:
-        config = yaml.load(file, Loader=SafeLoader)
-
-    authenticator = stauth.Authenticate(
-        config['credentials'],
-        config['cookie']['name'],
-        config['cookie']['key'],
-        config['cookie']['expiry_days'],
-        auto_hash = False
-    )
-    return authenticator
+    """
+    Returns this session's authenticator object.
+    Built once per session from the cached config and rebuilt only when config.yaml changes.
+    """
+    mtime = os.path.getmtime(AUTH_CONFIG_PATH)
+    cached = st.session_state.get("_authenticator")
+    if cached is None or cached[0] != mtime:
+        # Authenticate mutates the credentials (login flags, failed attempts): give it its own copy
+        config = copy.deepcopy(_load_auth_config(AUTH_CONFIG_PATH, mtime))
+        authenticator = stauth.Authenticate(
+            config['credentials'],
+            config['cookie']['name'],
+            config['cookie']['key'],
+            config['cookie']['expiry_days'],
+            auto_hash = False
+        )
+        st.session_state["_authenticator"] = cached = (mtime, authenticator)
+    return cached[1]
 
 # def require_login():
 #     """
@@ -35,18 +54,34 @@ def require_login():
     """
     Checks if user is logged in. 
     Returns the authenticator object so it can be reused.
+    The cookie is validated once per session; later reruns only check session state
+    until the cookie's expiry date.
     """
     authenticator = get_authenticator()
-    
-    # 🔴 CRITICAL FIX: This reads the cookie to restore the session!
-    # We use 'unrendered' so it checks the cookie but doesn't draw a login box.
-    try:
-        authenticator.login('unrendered')
-    except Exception as e:
-        st.error(e)
+
+    expires_at = st.session_state.get("_auth_expires_at")
+    if expires_at and time.time() > expires_at and st.session_state.get("authentication_status"):
+        # The re-authentication cookie this session was restored from has expired
+        st.session_state["authentication_status"] = None
+        st.session_state.pop("_auth_checked", None)
+
+    if not st.session_state.get("_auth_checked"):
+        # 🔴 CRITICAL FIX: This reads the cookie to restore the session!
+        # We use 'unrendered' so it checks the cookie but doesn't draw a login box.
+        try:
+            authenticator.login('unrendered')
+        except Exception as e:
+            st.error(e)
+        # Decoded cookie if it was read, else the expiry of a cookie set by this session's login form
+        cookie = authenticator.cookie_controller.cookie_model
+        token = cookie.token
+        st.session_state["_auth_expires_at"] = token.get("exp_date") if isinstance(token, dict) else cookie.exp_date
+        st.session_state["_auth_checked"] = True
     
     # Now that the session is restored from the cookie, we can check the status
     if st.session_state.get("authentication_status") is not True:
+        # Logged out or never logged in: the next page visit checks the cookie again
+        st.session_state.pop("_auth_checked", None)
         st.warning("Please log in to access this page.")
         st.switch_page("Login.py")
         st.stop()
@@ -0,0 +1,90 @@
+"""
+Cached Plotly figures for the dashboard pages.
+
+Building a figure (plotly.express above all) costs far more than drawing it,
+and the inputs are small aggregates that rarely change. plot_cached() keys
+each built figure by its builder plus a fingerprint of the input frame, so
+reruns and other sessions reuse it until the data changes. Time axes go out
+as typed arrays (see time_axis) and every render reports its JSON payload
+size to the metrics registry (pages/Query_Metrics.py).
+"""
+import hashlib
+import threading
+from collections import OrderedDict
+
+import numpy as np
+import pandas as pd
+import plotly.io as pio
+import streamlit as st
+import config
+from database.metrics import calling_page, get_metrics_registry
+
+FIGURE_CACHE_SIZE = getattr(config, "FIGURE_CACHE_SIZE", 64)
+
+
+def fingerprint(df: pd.DataFrame):
+    """Content hash of a frame (values, index, columns, dtypes); None if it holds unhashable values."""
+    try:
+        row_hashes = pd.util.hash_pandas_object(df, index=True).to_numpy()
+    except TypeError:
+        return None
+    digest = hashlib.blake2b(row_hashes.tobytes(), digest_size=16)
+    digest.update(repr([(str(c), str(t)) for c, t in df.dtypes.items()]).encode())
+    return digest.hexdigest()
+
+
+def time_axis(values) -> np.ndarray:
+    """
+    Datetimes as epoch milliseconds (float64). Plotly serializes numpy arrays as
+    base64 typed arrays, about a third of the size of ISO date strings; use with
+    an axis of type 'date'.
+    """
+    stamps = pd.to_datetime(pd.Series(values)).dt.tz_localize(None)
+    return stamps.to_numpy(dtype="datetime64[ms]").astype("int64").astype("float64")
+
+
+class FigureCache:
+    """LRU of built figures with their serialized size, shared by every session."""
+
+    def __init__(self, max_entries: int = FIGURE_CACHE_SIZE):
+        self.max_entries = max_entries
+        self._entries = OrderedDict()  # key -> (figure, payload bytes)
+        self._lock = threading.Lock()
+
+    def get_or_build(self, key, build) -> tuple:
+        """Returns (figure, payload bytes, cache hit). Figures are read-only once cached."""
+        with self._lock:
+            entry = self._entries.get(key) if key is not None else None
+            if entry is not None:
+                self._entries.move_to_end(key)
+                return entry[0], entry[1], True
+
+        figure = build()
+        nbytes = len(pio.to_json(figure, validate=False))
+        if key is not None:
+            with self._lock:
+                self._entries[key] = (figure, nbytes)
+                while len(self._entries) > self.max_entries:
+                    self._entries.popitem(last=False)
+        return figure, nbytes, False
+
+
+@st.cache_resource
+def get_figure_cache() -> FigureCache:
+    """One figure cache per process."""
+    return FigureCache()
+
+
+def plot_cached(build, df: pd.DataFrame, *args, **kwargs):
+    """
+    st.plotly_chart(build(df, *args, **kwargs)), building the figure only when `df`
+    (or the arguments) changed. `build` must not depend on anything else.
+    """
+    data_key = fingerprint(df)
+    # Pages run as __main__, so the builder is identified by its file and name
+    key = (build.__code__.co_filename, build.__qualname__, data_key, repr(args), repr(sorted(kwargs.items())))
+    figure, nbytes, hit = get_figure_cache().get_or_build(
+        key if data_key is not None else None, lambda: build(df, *args, **kwargs)
+    )
+    get_metrics_registry().record_chart(calling_page(), build.__name__, nbytes, hit)
+    st.plotly_chart(figure, width='stretch')
@@ -0,0 +1,137 @@
+"""
+Streaming exports: database -> server-side cursor -> chunked file on disk.
+
+Only one chunk of rows is in memory at a time, instead of the full DataFrame
+plus a CSV string plus its bytes copy. Files go to EXPORT_DIR and are deleted
+once downloaded; exports nobody downloaded are removed after EXPORT_MAX_AGE_SECONDS.
+"""
+import glob
+import gzip
+import json
+import os
+import tempfile
+import time
+
+import config
+
+CHUNK_SIZE = getattr(config, "EXPORT_CHUNK_SIZE", 50_000)
+ROW_LIMIT = getattr(config, "EXPORT_ROW_LIMIT", 1_000_000)
+EXPORT_DIR = getattr(config, "EXPORT_DIR", os.path.join(tempfile.gettempdir(), "dashboard_exports"))
+EXPORT_MAX_AGE_SECONDS = getattr(config, "EXPORT_MAX_AGE_SECONDS", 3600)
+
+# label -> (file extension, mime type)
+EXPORT_FORMATS = {
+    "CSV": ("csv", "text/csv"),
+    "CSV (gzip)": ("csv.gz", "application/gzip"),
+    "Parquet": ("parquet", "application/vnd.apache.parquet"),
+}
+
+
+def _write_csv(chunks, handle, progress):
+    rows = 0
+    for idx, chunk in enumerate(chunks):
+        chunk.to_csv(handle, header=(idx == 0), index=False)
+        rows += len(chunk)
+        progress(rows)
+    return rows
+
+
+def _nested_as_json(chunk):
+    """
+    json / jsonb / array columns arrive as dicts and lists, whose Arrow type is inferred
+    per chunk (a struct of the keys seen so far), so later chunks would not fit the file's
+    schema. They are written as JSON text instead.
+    """
+    nested = [
+        col for col in chunk.select_dtypes(include="object").columns
+        if chunk[col].map(lambda value: isinstance(value, (dict, list))).any()
+    ]
+    if not nested:
+        return chunk
+    chunk = chunk.copy(deep=False)
+    for col in nested:
+        chunk[col] = chunk[col].map(lambda value: None if value is None else json.dumps(value, default=str))
+    return chunk
+
+
+def _write_parquet(chunks, path, progress):
+    # Optional dependency: only needed for Parquet exports
+    import pyarrow as pa
+    import pyarrow.parquet as pq
+
+    rows, writer = 0, None
+    try:
+        for chunk in chunks:
+            table = pa.Table.from_pandas(_nested_as_json(chunk), preserve_index=False)
+            if writer is None:
+                writer = pq.ParquetWriter(path, table.schema)
+            else:
+                # A chunk whose column is all-NULL infers a different type
+                table = table.cast(writer.schema)
+            writer.write_table(table)
+            rows += len(chunk)
+            progress(rows)
+    finally:
+        if writer is not None:
+            writer.close()
+    return rows
+
+
+def remove_stale_exports(max_age: float = EXPORT_MAX_AGE_SECONDS) -> int:
+    """Deletes exports older than `max_age` seconds (abandoned sessions). Returns the number removed."""
+    removed, cutoff = 0, time.time() - max_age
+    for path in glob.glob(os.path.join(EXPORT_DIR, "export_*")):
+        try:
+            if os.path.getmtime(path) < cutoff:
+                os.remove(path)
+                removed += 1
+        except OSError:
+            pass  # Already gone (served or removed by another session)
+    return removed
+
+
+def read_and_remove(path: str) -> bytes:
+    """The export's bytes; the file is deleted once read (it is served once)."""
+    try:
+        with open(path, "rb") as handle:
+            return handle.read()
+    finally:
+        os.remove(path)
+
+
+def export_query(db, query: str, params: dict = None, fmt: str = "CSV",
+                 row_limit: int = ROW_LIMIT, chunk_size: int = CHUNK_SIZE,
+                 progress=None) -> dict:
+    """
+    Streams `query` into a temporary file in the requested format.
+    progress(rows_written) is called after every chunk.
+    Returns {"path", "rows", "bytes", "seconds"}; serve the file with read_and_remove().
+    """
+    extension, _ = EXPORT_FORMATS[fmt]
+    progress = progress or (lambda rows: None)
+    chunks = db.stream_chunks(query, params, chunk_size=chunk_size, row_limit=row_limit)
+
+    remove_stale_exports()
+    os.makedirs(EXPORT_DIR, exist_ok=True)
+    started = time.perf_counter()
+    fd, path = tempfile.mkstemp(suffix=f".{extension}", prefix="export_", dir=EXPORT_DIR)
+    os.close(fd)
+    try:
+        if fmt == "Parquet":
+            rows = _write_parquet(chunks, path, progress)
+        elif fmt == "CSV (gzip)":
+            with gzip.open(path, "wt", encoding="utf-8", newline="") as handle:
+                rows = _write_csv(chunks, handle, progress)
+        else:
+            with open(path, "w", encoding="utf-8", newline="") as handle:
+                rows = _write_csv(chunks, handle, progress)
+    except Exception:
+        os.remove(path)
+        raise
+
+    return {
+        "path": path,
+        "rows": rows,
+        "bytes": os.path.getsize(path),
+        "seconds": time.perf_counter() - started,
+    }
@@ -1,8 +1,13 @@
 """
 Helper functions and utilities
 """
+import os
+import time
 import streamlit as st
 from datetime import datetime
+from database.live import CHANNEL, get_change_listener
+from database.metrics import calling_page, get_metrics_registry
+from utils.export import EXPORT_FORMATS, ROW_LIMIT, export_query, read_and_remove
 
 
 def apply_custom_css():
@@ -24,6 +29,45 @@ def apply_custom_css():
     """, unsafe_allow_html=True)
 
 
+def flash(message, icon="✅"):
+    """
+    Queues a message for the next run of the page (see show_flash), so a write
+    can st.rerun() / st.switch_page() at once instead of sleeping to keep it readable.
+    """
+    st.session_state.setdefault("flash_messages", []).append((message, icon, time.perf_counter()))
+
+
+def show_flash():
+    """
+    Shows queued flash messages as toasts. Call it at the END of the page: the time from
+    the first flash() (the submit) to here is recorded as the page's 'refresh' latency.
+    """
+    messages = st.session_state.pop("flash_messages", [])
+    for message, icon, _ in messages:
+        st.toast(message, icon=icon, duration="long" if icon == "❌" else "short")
+    if messages:
+        get_metrics_registry().record_latency("refresh", calling_page(), (time.perf_counter() - messages[0][2]) * 1000)
+
+
+def live_refresh_controls(connection_name):
+    """Sidebar switch for wall-monitor mode: panels refresh themselves (see database/live.py)"""
+    st.sidebar.toggle(
+        "🔴 Live refresh", key="live_refresh",
+        help="Panels update on their own interval; they only re-query when the data changed."
+    )
+    if st.session_state.get("live_refresh"):
+        listener = get_change_listener(connection_name)
+        if listener.connected and listener.triggers_installed:
+            st.sidebar.caption(f"Listening for changes on '{CHANNEL}'")
+        elif listener.connected:
+            st.sidebar.caption(
+                "NOTIFY triggers are not installed (python -m database.live --install-triggers); "
+                "panels re-query when their cache expires."
+            )
+        else:
+            st.sidebar.caption("No change notifications available; panels re-query when their cache expires.")
+
+
 def display_metrics(df):
     """Display summary metrics"""
     col1, col2, col3, col4 = st.columns(4)
@@ -49,15 +93,59 @@ def get_categorical_columns(df):
     return df.select_dtypes(include=['object', 'category']).columns.tolist()
 
 
-def create_download_button(df, table_name):
-    """Create CSV download button"""
-    csv = df.to_csv(index=False).encode('utf-8')
-    timestamp = datetime.now().strftime('%Y%m%d_%H%M%S')
-    st.download_button(
-        label="📥 Download CSV",
-        data=csv,
-        file_name=f"{table_name}_{timestamp}.csv",
-        mime="text/csv",
-        width='stretch'
-    )
-    
\ No newline at end of file
+def create_export_button(db, query, table_name, params=None, key="export", expected_rows=None):
+    """
+    Streamed export (CSV / gzip CSV / Parquet) of a query's full result.
+    The file is built chunk by chunk on disk only when the user asks for it,
+    read only when the download is clicked, and deleted once served.
+    """
+    state_key = f"{key}_file"
+    col1, col2 = st.columns([1, 1])
+
+    with col1:
+        fmt = st.selectbox("Export format", list(EXPORT_FORMATS.keys()), key=f"{key}_format")
+
+    with col2:
+        if st.button("📦 Prepare export", key=f"{key}_prepare", width='stretch'):
+            # Remove the previous export of this widget before building a new one
+            previous = st.session_state.pop(state_key, None)
+            if previous and os.path.exists(previous["path"]):
+                os.remove(previous["path"])
+
+            total = min(expected_rows or ROW_LIMIT, ROW_LIMIT)
+            progress_bar = st.progress(0.0, text="Exporting...")
+
+            def report_progress(rows):
+                progress_bar.progress(min(rows / total, 1.0) if total else 1.0, text=f"Exported {rows:,} rows")
+
+            try:
+                result = export_query(db, query, params, fmt=fmt, progress=report_progress)
+            except Exception as e:
+                progress_bar.empty()
+                st.error(f"❌ Export failed: {e}")
+                return
+
+            progress_bar.empty()
+            st.session_state[state_key] = {**result, "format": fmt}
+
+    export = st.session_state.get(state_key)
+    if export and not os.path.exists(export["path"]):
+        # Downloaded (or expired): prepare again for a fresh copy
+        st.session_state.pop(state_key, None)
+    elif export:
+        extension, mime = EXPORT_FORMATS[export["format"]]
+        timestamp = datetime.now().strftime('%Y%m%d_%H%M%S')
+        limit_note = " (row limit reached)" if export["rows"] >= ROW_LIMIT else ""
+        st.caption(
+            f"{export['rows']:,} rows{limit_note} · {export['bytes'] / 1024 / 1024:.1f} MB · "
+            f"{export['rows'] / max(export['seconds'], 1e-6):,.0f} rows/s"
+        )
+        # Deferred: the file is only read when the button is clicked, not on every rerun
+        st.download_button(
+            label=f"📥 Download {export['format']}",
+            data=lambda path=export["path"]: read_and_remove(path),
+            file_name=f"{table_name}_{timestamp}.{extension}",
+            mime=mime,
+            key=f"{key}_download",
+            width='stretch'
+        )
@@ -1,14 +1,24 @@
+import pandas as pd
 import streamlit as st
 from database.db_manager import DatabaseManager
 
+# Cached frames are shared between sessions as copy-on-write views: a page that
+# modifies its frame gets private copies of the touched columns instead of
+# changing what every other session sees. (Default behaviour from pandas 3.0.)
+# Set here, at app startup: every page gets its database manager from this module.
+pd.set_option("mode.copy_on_write", True)
+
+
+@st.cache_resource
+def _shared_manager(target: str) -> DatabaseManager:
+    # DatabaseManager holds no per-user state: pools, cached results and metrics are process-wide
+    return DatabaseManager(target)
+
+
 def get_manager(target: str) -> DatabaseManager:
     """
     Factory function to get the correct DB manager.
     target: 'dashboard_db' or 'management_db' (keys in secrets.toml)
+    One instance per process, shared by every session.
     """
-    session_key = f"db_mgr_{target}"
-    
-    if session_key not in st.session_state:
-        st.session_state[session_key] = DatabaseManager(target)
-        
-    return st.session_state[session_key]
\ No newline at end of file
+    return _shared_manager(target)